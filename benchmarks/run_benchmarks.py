@@ -0,0 +1,206 @@
+"""
+BENCHMARK SUITE - Time and memory per pipeline stage
+=====================================================
+Project: NPA Analysis Dashboard
+
+Generates a synthetic panel (see benchmarks/synthetic.py) and times each
+stage: load/save, validation (validate.get_valid_data from a fresh
+validator, *_cached from an already-run one), every analytics engine, the
+dense tensor and the per-page data prep of the dashboard. Wall time is the
+best of --repeat runs; peak memory is measured in a separate run under
+tracemalloc (Python and NumPy allocations; Arrow buffers from Parquet reads
+are not traced).
+
+Results can be stored as a baseline (benchmarks/baselines/<banks>x<periods>.json)
+and later runs are compared against it.
+
+Run with:
+    python -m benchmarks.run_benchmarks --banks 10000 --periods 100
+    python -m benchmarks.run_benchmarks --banks 10000 --periods 100 --save-baseline
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from src.data_model import save_csv, load_csv, save_table, load_table
+from src.validate import DataValidator
+from src.panel import BankPanel, PanelTensor
+from src.analytics import AssetQualityAnalytics, ProfitabilityAnalytics, PeerComparisonAnalytics, \
+    PanelTimeSeries, RankingsCube
+from src.artifacts import build_artifacts
+
+from benchmarks.synthetic import synthetic_panel
+
+BASELINE_DIR = Path(__file__).parent / 'baselines'
+
+# Slower than baseline by more than this factor is flagged
+REGRESSION_FACTOR = 1.2
+
+
+def build_stages(df, workdir):
+    """Ordered list of (stage name, zero-argument callable)"""
+    csv_path = str(Path(workdir) / 'bank_metrics.csv')
+    parquet_path = str(Path(workdir) / 'bank_metrics.parquet')
+    save_csv(df, csv_path)
+    save_table(df, parquet_path)
+
+    validator = DataValidator(df)
+    validator.run_all_validations()
+
+    panel = BankPanel(df)
+    asset_quality = AssetQualityAnalytics(panel)
+    profitability = ProfitabilityAnalytics(panel)
+    peer = PeerComparisonAnalytics(panel)
+    bank = df['bank'].iloc[0]
+    period = df['period'].iloc[-1]
+
+    def fresh_valid_data():
+        fresh = DataValidator(df)
+        fresh.run_all_validations()
+        return fresh.get_valid_data()
+
+    tensor = PanelTensor(df)
+    tensor.values  # build once; the tensor.* query stages time the warm array
+
+    def fresh_latest_index():
+        panel.invalidate()
+        return panel.latest_index
+
+    return [
+        ('io.save_csv', lambda: save_csv(df, csv_path)),
+        ('io.load_csv', lambda: load_csv(csv_path)),
+        ('io.save_parquet', lambda: save_table(df, parquet_path)),
+        ('io.load_parquet', lambda: load_table(parquet_path)),
+        ('io.load_parquet_projected', lambda: load_table(
+            parquet_path, columns=['bank', 'period', 'gnpa_pct'], banks=[bank])),
+        ('validate.run_all_validations', lambda: DataValidator(df).run_all_validations()),
+        ('validate.get_valid_data', fresh_valid_data),
+        ('validate.get_valid_data_cached', lambda: validator.get_valid_data()),
+        ('panel.build', lambda: BankPanel(df)),
+        ('panel.latest_index', fresh_latest_index),
+        ('asset_quality.latest_metrics', asset_quality.latest_metrics),
+        ('asset_quality.gnpa_trend', lambda: asset_quality.gnpa_trend(bank)),
+        ('asset_quality.trend_summary', asset_quality.trend_summary),
+        ('asset_quality.spread_analysis', asset_quality.spread_analysis),
+        ('profitability.nim_trends', profitability.nim_trends),
+        ('profitability.casa_trends', profitability.casa_trends),
+        ('profitability.profitability_vs_risk', profitability.profitability_vs_risk),
+        ('peer.latest_rankings', peer.latest_rankings),
+        ('peer.quadrant_view', peer.quadrant_view),
+        ('peer.quadrant_history', peer.quadrant_history),
+        ('peer.rankings_cube', lambda: RankingsCube(panel)),
+        ('timeseries.changes', lambda: PanelTimeSeries(panel).changes()),
+        ('tensor.build', lambda: PanelTensor(df).values),
+        ('tensor.latest_values', tensor.latest_values),
+        ('tensor.cross_section', tensor.cross_section),
+        ('tensor.slopes', tensor.slopes),
+        ('app.artifacts', lambda: build_artifacts(panel)),
+        ('app.deep_dive_slice', lambda: panel.bank_rows(bank)),
+        ('app.source_lookup', lambda: panel.lookup(bank, period)),
+    ]
+
+
+def time_stage(func, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func):
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def run_benchmarks(n_banks, n_periods, error_rate=0.01, warning_rate=0.02, repeat=3, seed=0):
+    """
+    Run every stage on a synthetic panel
+
+    Returns:
+        dict: {'config': {...}, 'stages': {name: {'seconds', 'peak_bytes'}}}
+    """
+    df = synthetic_panel(n_banks, n_periods, error_rate, warning_rate, seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as workdir, \
+            contextlib.redirect_stdout(io.StringIO()):
+        for name, func in build_stages(df, workdir):
+            results[name] = {
+                'seconds': time_stage(func, repeat),
+                'peak_bytes': peak_memory(func),
+            }
+    return {
+        'config': {
+            'banks': n_banks, 'periods': n_periods, 'rows': len(df),
+            'error_rate': error_rate, 'warning_rate': warning_rate,
+            'repeat': repeat, 'seed': seed,
+        },
+        'stages': results,
+    }
+
+
+def baseline_path(n_banks, n_periods):
+    return BASELINE_DIR / f"{n_banks}x{n_periods}.json"
+
+
+def print_results(results, baseline=None):
+    """Print a stage table, with ratios to baseline if given"""
+    config = results['config']
+    print("\n" + "="*78)
+    print(f"BENCHMARKS - {config['banks']} banks × {config['periods']} periods "
+          f"({config['rows']:,} rows)")
+    print("="*78)
+    print(f"  {'stage':38} {'time (s)':>10} {'peak MB':>10} {'vs base':>10}")
+    print("-" * 78)
+    for name, stage in results['stages'].items():
+        ratio = ''
+        if baseline and name in baseline['stages']:
+            base = baseline['stages'][name]['seconds']
+            factor = stage['seconds'] / base if base else float('inf')
+            flag = ' ⚠️' if factor > REGRESSION_FACTOR else ''
+            ratio = f"{factor:.2f}x{flag}"
+        print(f"  {name:38} {stage['seconds']:>10.4f} "
+              f"{stage['peak_bytes'] / 1e6:>10.1f} {ratio:>10}")
+    print("="*78 + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the NPA pipeline on synthetic data")
+    parser.add_argument('--banks', type=int, default=1000)
+    parser.add_argument('--periods', type=int, default=40)
+    parser.add_argument('--error-rate', type=float, default=0.01)
+    parser.add_argument('--warning-rate', type=float, default=0.02)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="Store results as the baseline for this size")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.banks, args.periods, args.error_rate,
+                             args.warning_rate, args.repeat, args.seed)
+
+    path = baseline_path(args.banks, args.periods)
+    baseline = json.loads(path.read_text()) if path.exists() else None
+    print_results(results, baseline)
+
+    if args.save_baseline:
+        BASELINE_DIR.mkdir(exist_ok=True)
+        path.write_text(json.dumps(results, indent=2))
+        print(f"✅ Baseline saved to: {path}")
+    return results
+
+
+if __name__ == "__main__":
+    main()
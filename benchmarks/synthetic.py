@@ -0,0 +1,99 @@
+"""
+SYNTHETIC PANEL GENERATOR - Tidy tables at benchmark scale
+===========================================================
+Project: NPA Analysis Dashboard
+
+Builds bank × period tables in the SCHEMA layout. The first banks are
+the real bank_list universe, followed by generated codes (B000013, ...).
+Periods walk back quarter by quarter from the latest collection quarter,
+like bank_list.QUARTERS. Error and warning rates control how many rows
+violate the DataValidator rules.
+"""
+
+import numpy as np
+import pandas as pd
+
+from src.bank_list import QUARTERS, get_all_banks
+
+
+def synthetic_banks(n_banks):
+    """Real bank codes first, then generated ones"""
+    real = list(get_all_banks(include_optional=True))
+    codes = real[:n_banks]
+    codes += [f"B{i:06d}" for i in range(len(codes), n_banks)]
+    return codes
+
+
+def synthetic_periods(n_periods, latest=QUARTERS[0]):
+    """n_periods quarter labels ('YYYY-Qn'), oldest first, ending at latest"""
+    year, quarter = int(latest[:4]), int(latest[-1])
+    periods = []
+    for _ in range(n_periods):
+        periods.append(f"{year}-Q{quarter}")
+        quarter -= 1
+        if quarter == 0:
+            year, quarter = year - 1, 4
+    return periods[::-1]
+
+
+def synthetic_panel(n_banks=15, n_periods=12, error_rate=0.0, warning_rate=0.0, seed=0):
+    """
+    Generate a tidy bank metrics table
+
+    Args:
+        n_banks (int): Number of banks
+        n_periods (int): Number of quarters per bank
+        error_rate (float): Share of rows breaking an ERROR rule
+                            (GNPA < NNPA, invalid CASA, missing metric)
+        warning_rate (float): Share of rows breaking a WARNING rule
+                              (NIM out of range, high GNPA)
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: n_banks × n_periods rows in SCHEMA column order
+    """
+    rng = np.random.default_rng(seed)
+    banks = synthetic_banks(n_banks)
+    periods = synthetic_periods(n_periods)
+    n_rows = n_banks * n_periods
+
+    bank_col = np.repeat(np.array(banks, dtype=object), n_periods)
+    period_col = np.tile(np.array(periods, dtype=object), n_banks)
+
+    gnpa = rng.uniform(0.5, 6.0, n_rows)
+    nnpa = gnpa * rng.uniform(0.1, 0.4, n_rows)
+    nim = rng.uniform(2.0, 5.0, n_rows)
+    casa = rng.uniform(25.0, 55.0, n_rows)
+
+    # Errors: split evenly across the three ERROR rules
+    n_errors = int(round(n_rows * error_rate))
+    error_rows = rng.choice(n_rows, size=n_errors, replace=False)
+    for kind, rows in enumerate(np.array_split(error_rows, 3)):
+        if kind == 0:
+            nnpa[rows] = gnpa[rows] + 0.5
+        elif kind == 1:
+            casa[rows] = 100 + rng.uniform(1, 20, len(rows))
+        else:
+            casa[rows] = np.nan
+
+    # Warnings: split across the two WARNING rules, avoiding error rows
+    n_warnings = int(round(n_rows * warning_rate))
+    pool = np.setdiff1d(np.arange(n_rows), error_rows)
+    warning_rows = rng.choice(pool, size=min(n_warnings, len(pool)), replace=False)
+    nim_rows, gnpa_rows = np.array_split(warning_rows, 2)
+    nim[nim_rows] = rng.uniform(8.5, 10.0, len(nim_rows))
+    gnpa[gnpa_rows] = rng.uniform(15.5, 25.0, len(gnpa_rows))
+
+    return pd.DataFrame({
+        'bank': bank_col,
+        'period_type': 'Quarter',
+        'period': period_col,
+        'gnpa_pct': gnpa.round(2),
+        'nnpa_pct': nnpa.round(2),
+        'nim_pct': nim.round(2),
+        'casa_pct': casa.round(2),
+        'source_url': [f"https://www.nseindia.com/corporate/resultcompany/{b}_quarterly_{p}.pdf"
+                       for b, p in zip(bank_col, period_col)],
+        'source_doc_date': '2026-01-15',
+        'notes': 'Synthetic benchmark data',
+    })
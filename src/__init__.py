@@ -8,10 +8,16 @@ across Indian banks using Python, Pandas, Plotly, and Streamlit.
 
 Modules:
     - data_model: Data schema and validation
+    - store: Partitioned tidy store keyed on (bank, period)
     - bank_list: Bank universe selection and management
     - ingest: Data collection and ingestion workflow
+    - extract: Batch metric extraction from filing PDFs
     - validate: Data quality validation rules
+    - panel: Shared bank x period table with cached indexes
     - analytics: Analytics engines and calculations
+    - artifacts: Precomputed dashboard aggregates keyed by data hash
+    - charts: Downsampling of plot data (LTTB, scatter binning)
+    - pipeline: Single-pass bank_list → ingest → validate → analytics runner
     - app: Streamlit dashboard application
 
 Author: Prof. V. Ravichandran
@@ -31,12 +37,20 @@ from .data_model import (
     create_sample_data
 )
 
+from .store import TidyStore
+
 from .validate import DataValidator
 
+from .panel import BankPanel, PanelTensor
+
+from .artifacts import ArtifactStore, build_artifacts
+
 from .analytics import (
     AssetQualityAnalytics,
     ProfitabilityAnalytics,
-    PeerComparisonAnalytics
+    PeerComparisonAnalytics,
+    RankingsCube,
+    classify_quadrants
 )
 
 __all__ = [
@@ -45,8 +59,15 @@ __all__ = [
     'load_csv',
     'print_schema',
     'create_sample_data',
+    'TidyStore',
     'DataValidator',
+    'BankPanel',
+    'PanelTensor',
+    'ArtifactStore',
+    'build_artifacts',
     'AssetQualityAnalytics',
     'ProfitabilityAnalytics',
     'PeerComparisonAnalytics',
+    'RankingsCube',
+    'classify_quadrants',
 ]
@@ -6,7 +6,7 @@ Project: NPA Analysis Dashboard
 Date: January 18, 2026
 
 Analytics modules:
-A) Asset Quality: GNPA/NNPA trends, YoY changes
+A) Asset Quality: GNPA/NNPA trends, YoY changes (PanelTimeSeries)
 B) Profitability: NIM, CASA trends
 C) Peer Comparison: Rankings, quadrant view
 """
@@ -15,95 +15,505 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+try:
+    from .data_model import find_table, load_table
+    from .panel import BankPanel
+except ImportError:  # run as a script from src/
+    from data_model import find_table, load_table
+    from panel import BankPanel
+
+# ===== QUADRANT ENGINE =====
+QUADRANT_LABELS = ['BEST', 'CAUTION', 'WATCH', 'WORST']
+SPLIT_METHODS = ['median', 'mean', 'percentile', 'fixed']
+
+
+def classify_quadrants(df, x='casa_pct', y='gnpa_pct', split='median', q=50,
+                       thresholds=None, x_higher_is_better=True, y_higher_is_better=False,
+                       by='period'):
+    """
+    Vectorized quadrant classification over any pair of metrics
+    
+    A row is "good" on an axis when it beats that axis' split point
+    (strictly). BEST = good on both, CAUTION = good x only, WATCH = good
+    y only, WORST = neither (including missing values). The defaults
+    reproduce the CASA vs GNPA median view.
+    
+    Args:
+        df (pd.DataFrame): Rows to classify
+        x, y (str): Metric columns
+        split (str): 'median', 'mean', 'percentile' (uses q) or 'fixed'
+        q (float): Percentile (0-100) for split='percentile'
+        thresholds (tuple): (x_split, y_split) for split='fixed'
+        x_higher_is_better, y_higher_is_better (bool): Axis direction
+        by (str): Column defining cross-sections (e.g. 'period'), so
+                  all periods are classified at once; None = whole frame
+    
+    Returns:
+        pd.DataFrame: x_split, y_split and quadrant, aligned to df.index
+    """
+    if split not in SPLIT_METHODS:
+        raise ValueError(f"split must be one of {SPLIT_METHODS}")
+    
+    if split == 'fixed':
+        if thresholds is None:
+            raise ValueError("split='fixed' requires thresholds=(x_split, y_split)")
+        x_split = np.full(len(df), float(thresholds[0]))
+        y_split = np.full(len(df), float(thresholds[1]))
+    else:
+        func, args = ('quantile', (q / 100,)) if split == 'percentile' else (split, ())
+        if by is None:
+            x_split = np.full(len(df), getattr(df[x], func)(*args))
+            y_split = np.full(len(df), getattr(df[y], func)(*args))
+        else:
+            grouped = df.groupby(by, observed=True, sort=False)
+            x_split = grouped[x].transform(func, *args).to_numpy(dtype=float)
+            y_split = grouped[y].transform(func, *args).to_numpy(dtype=float)
+    
+    x_vals = df[x].to_numpy(dtype=float)
+    y_vals = df[y].to_numpy(dtype=float)
+    # NaN compares False both ways, so a missing value lands in WORST
+    with np.errstate(invalid='ignore'):
+        x_good = x_vals > x_split if x_higher_is_better else x_vals < x_split
+        x_bad = x_vals <= x_split if x_higher_is_better else x_vals >= x_split
+        y_good = y_vals > y_split if y_higher_is_better else y_vals < y_split
+        y_bad = y_vals <= y_split if y_higher_is_better else y_vals >= y_split
+    
+    quadrant = np.select(
+        [x_good & y_good, x_good & y_bad, x_bad & y_good],
+        QUADRANT_LABELS[:3], default=QUADRANT_LABELS[3])
+    
+    return pd.DataFrame({'x_split': x_split, 'y_split': y_split, 'quadrant': quadrant},
+                        index=df.index)
+
+
+# ===== BATCHED TRENDS =====
+TREND_METRICS = ['gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
+
+
+def _quarter_index(df):
+    """Quarters since year 0 (full-year rows sit on their Q4)"""
+    quarter = df['quarter'].to_numpy()
+    return df['fiscal_year'].to_numpy().astype(np.int64) * 4 + np.where(quarter == 0, 4, quarter) - 1
+
+
+def _trend_table(ordered):
+    """
+    Per-bank trend statistics from rows sorted by (bank, period_key)
+    
+    For every metric: first, last, mean, min, max, change (last - first),
+    direction (sign of change, int8), slope (least squares, per quarter),
+    qoq and yoy (latest quarter vs 1 and 4 quarters earlier, NaN when that
+    quarter is missing). Plus n_periods and the GNPA 'trend' label used by
+    gnpa_trend(). All of it comes from one groupby over the sorted rows.
+    """
+    t = _quarter_index(ordered).astype(float)
+    banks = ordered['bank'].to_numpy()
+    
+    # One frame of per-row terms so a single groupby gives every statistic
+    terms = {'bank': banks, 't_quarterly': np.where(ordered['quarter'].to_numpy() > 0, t, np.nan)}
+    for metric in TREND_METRICS:
+        x = ordered[metric].to_numpy(dtype=float)
+        t_valid = np.where(np.isnan(x), np.nan, t)
+        terms.update({
+            metric: x,
+            f'{metric}__n': ~np.isnan(x),
+            f'{metric}__t': t_valid,
+            f'{metric}__tt': t_valid * t_valid,
+            f'{metric}__tx': t_valid * x,
+        })
+    grouped = pd.DataFrame(terms).groupby('bank', observed=True, sort=False)
+    
+    agg = {metric: ['first', 'last', 'mean', 'min', 'max', 'sum'] for metric in TREND_METRICS}
+    agg.update({f'{metric}__{term}': 'sum' for metric in TREND_METRICS for term in ('n', 't', 'tt', 'tx')})
+    agg['t_quarterly'] = 'max'
+    stats = grouped.agg(agg)
+    stats.columns = [f"{col}_{stat}" if col in TREND_METRICS else col for col, stat in stats.columns]
+    
+    summary = pd.DataFrame(index=stats.index)
+    
+    # Values at the latest quarter and 1/4 quarters before it
+    quarterly = pd.Series(t, index=banks)[ordered['quarter'].to_numpy() > 0]
+    lookup = pd.DataFrame(ordered.loc[ordered['quarter'].to_numpy() > 0, TREND_METRICS].to_numpy(dtype=float),
+                          index=pd.MultiIndex.from_arrays([quarterly.index, quarterly.to_numpy()]),
+                          columns=TREND_METRICS)
+    lookup = lookup[~lookup.index.duplicated(keep='last')]
+    last_t = stats['t_quarterly'].to_numpy()
+    at = {lag: lookup.reindex(pd.MultiIndex.from_arrays([stats.index, last_t - lag])).to_numpy()
+          for lag in (0, 1, 4)}
+    
+    for k, metric in enumerate(TREND_METRICS):
+        for stat in ('first', 'last', 'mean', 'min', 'max'):
+            summary[f'{metric}_{stat}'] = stats[f'{metric}_{stat}']
+        change = stats[f'{metric}_last'] - stats[f'{metric}_first']
+        summary[f'{metric}_change'] = change
+        summary[f'{metric}_direction'] = np.sign(change.fillna(0)).astype(np.int8)
+        
+        n, st, stt, stx, sx = (stats[f'{metric}__n'], stats[f'{metric}__t'], stats[f'{metric}__tt'],
+                               stats[f'{metric}__tx'], stats[f'{metric}_sum'])
+        denom = n * stt - st * st
+        with np.errstate(divide='ignore', invalid='ignore'):
+            summary[f'{metric}_slope'] = np.where(denom > 0, (n * stx - st * sx) / denom, np.nan)
+        summary[f'{metric}_qoq'] = at[0][:, k] - at[1][:, k]
+        summary[f'{metric}_yoy'] = at[0][:, k] - at[4][:, k]
+    
+    summary['n_periods'] = grouped.size()
+    summary['trend'] = np.where(
+        summary['n_periods'] <= 1, 'Stable',
+        np.where(summary['gnpa_pct_last'] < summary['gnpa_pct_first'], 'Improving', 'Deteriorating'))
+    return summary.rename_axis('bank').reset_index()
+
+
 class AssetQualityAnalytics:
     """Asset quality analysis"""
     
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, data):
+        self.panel = BankPanel.wrap(data)
+        self._trend_cache = None
+    
+    @property
+    def df(self):
+        return self.panel.df
     
     def latest_metrics(self):
         """Get latest metrics for each bank"""
-        latest = self.df.loc[self.df.groupby('bank')['period'].idxmax()]
+        latest = self.panel.latest()
         return latest.sort_values('gnpa_pct')[['bank', 'period', 'gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']]
     
+    def _trend_state(self):
+        """
+        Rows sorted by (bank, period), per-bank row positions and the full
+        trend table, computed once per panel version
+        """
+        if self._trend_cache is None or self._trend_cache[0] != self.panel.version:
+            ordered = self.df.sort_values(['bank', 'period_key'], kind='stable')
+            positions = ordered.groupby('bank', observed=True, sort=False).indices
+            table = _trend_table(ordered).set_index('bank')
+            self._trend_cache = (self.panel.version, ordered, positions, table)
+        return self._trend_cache[1:]
+    
     def gnpa_trend(self, bank_code):
-        """Get GNPA trend for single bank"""
-        bank_data = self.df[self.df['bank'] == bank_code].sort_values('period')
+        """Get GNPA trend for single bank (served from the batched trend table)"""
+        ordered, positions, table = self._trend_state()
+        rows = ordered.iloc[positions.get(bank_code, [])]
+        
+        if bank_code in table.index:
+            summary = table.loc[bank_code]
+            gnpa_avg, gnpa_min, gnpa_max = summary['gnpa_pct_mean'], summary['gnpa_pct_min'], summary['gnpa_pct_max']
+            trend = summary['trend']
+        else:
+            gnpa_avg = gnpa_min = gnpa_max = np.nan
+            trend = 'Stable'
         
         return {
-            'periods': bank_data['period'].tolist(),
-            'gnpa_pct': bank_data['gnpa_pct'].tolist(),
-            'nnpa_pct': bank_data['nnpa_pct'].tolist(),
-            'gnpa_avg': bank_data['gnpa_pct'].mean(),
-            'gnpa_min': bank_data['gnpa_pct'].min(),
-            'gnpa_max': bank_data['gnpa_pct'].max(),
-            'trend': 'Improving' if len(bank_data) > 1 and bank_data['gnpa_pct'].iloc[-1] < bank_data['gnpa_pct'].iloc[0] else 'Stable' if len(bank_data) <= 1 else 'Deteriorating',
+            'periods': rows['period'].tolist(),
+            'gnpa_pct': rows['gnpa_pct'].tolist(),
+            'nnpa_pct': rows['nnpa_pct'].tolist(),
+            'gnpa_avg': gnpa_avg,
+            'gnpa_min': gnpa_min,
+            'gnpa_max': gnpa_max,
+            'trend': trend,
         }
     
+    def trend_summary(self, banks=None):
+        """
+        Batched trend statistics for every bank and metric (see
+        _trend_table for the columns)
+        
+        Args:
+            banks (list): Restrict to these banks (default: all, cached)
+        """
+        if banks is None:
+            return self._trend_state()[2].reset_index()
+        df = self.df[self.df['bank'].isin(banks)]
+        return _trend_table(df.sort_values(['bank', 'period_key'], kind='stable'))
+    
     def spread_analysis(self):
         """GNPA - NNPA spread (proxy for provision effectiveness)"""
-        self.df['spread_bps'] = (self.df['gnpa_pct'] - self.df['nnpa_pct']) * 100
-        
-        latest = self.df.loc[self.df.groupby('bank')['period'].idxmax()]
+        latest = self.panel.latest(['bank', 'gnpa_pct', 'nnpa_pct'])
+        latest['spread_bps'] = (latest['gnpa_pct'] - latest['nnpa_pct']) * 100
         return latest[['bank', 'gnpa_pct', 'nnpa_pct', 'spread_bps']].sort_values('spread_bps', ascending=False)
 
 
 class ProfitabilityAnalytics:
     """Profitability and funding analysis"""
     
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, data):
+        self.panel = BankPanel.wrap(data)
+    
+    @property
+    def df(self):
+        return self.panel.df
     
     def nim_trends(self):
         """Latest NIM for each bank"""
-        latest = self.df.loc[self.df.groupby('bank')['period'].idxmax()]
+        latest = self.panel.latest()
         return latest.sort_values('nim_pct', ascending=False)[['bank', 'nim_pct']]
     
     def casa_trends(self):
         """Latest CASA for each bank"""
-        latest = self.df.loc[self.df.groupby('bank')['period'].idxmax()]
+        latest = self.panel.latest()
         return latest.sort_values('casa_pct', ascending=False)[['bank', 'casa_pct']]
     
     def profitability_vs_risk(self):
         """NIM vs GNPA scatter data"""
-        latest = self.df.loc[self.df.groupby('bank')['period'].idxmax()]
+        latest = self.panel.latest()
         return latest[['bank', 'nim_pct', 'gnpa_pct', 'casa_pct']].sort_values('nim_pct', ascending=False)
 
 
 class PeerComparisonAnalytics:
     """Peer benchmarking"""
     
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, data):
+        self.panel = BankPanel.wrap(data)
+    
+    @property
+    def df(self):
+        return self.panel.df
     
     def latest_rankings(self):
         """Full rankings for latest period"""
-        latest = self.df.loc[self.df.groupby('bank')['period'].idxmax()]
+        latest = self.panel.latest()
         rankings = latest.sort_values('gnpa_pct')[['bank', 'gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']]
         rankings['gnpa_rank'] = range(1, len(rankings) + 1)
         return rankings
     
-    def quadrant_view(self):
+    def quadrant_view(self, x='casa_pct', y='gnpa_pct', **split_options):
         """
         Quadrant analysis:
         X-axis: CASA (funding)
         Y-axis: GNPA (risk)
         Best: High CASA + Low GNPA (top-right)
+        
+        Any metric pair and split rule can be passed through to
+        classify_quadrants (e.g. split='percentile', q=75).
         """
-        latest = self.df.loc[self.df.groupby('bank')['period'].idxmax()]
+        latest = self.panel.latest()
+        latest['quadrant'] = classify_quadrants(latest, x, y, by=None, **split_options)['quadrant']
+        return latest[['bank', x, y, 'quadrant']].sort_values('quadrant')
+    
+    def quadrant_history(self, x='casa_pct', y='gnpa_pct', **split_options):
+        """Quadrant of every bank in every period (split points per period)"""
+        classified = classify_quadrants(self.df, x, y, by='period', **split_options)
+        history = self.df[['bank', 'period', 'period_key', x, y]].join(classified)
+        return history.sort_values('period_key', kind='stable')
+
+
+class PanelTimeSeries:
+    """
+    QoQ / YoY / rolling / cumulative changes over the bank × period panel
+    
+    Each metric is pivoted once into a (banks, quarters) matrix over a
+    contiguous quarter grid, so a missing quarter is a NaN column entry
+    and lags are true calendar lags. Every computation is a whole-matrix
+    array operation - no per-bank loops. Full-year (FY) rows are ignored.
+    """
+    
+    def __init__(self, data, metrics=TREND_METRICS):
+        df = BankPanel.wrap(data).df
+        df = df[df['quarter'].to_numpy() > 0]
+        self.metrics = list(metrics)
         
-        casa_median = latest['casa_pct'].median()
-        gnpa_median = latest['gnpa_pct'].median()
+        bank_codes, self.banks = pd.factorize(df['bank'], sort=True)
+        t = _quarter_index(df)
+        t0 = int(t.min()) if len(t) else 0
+        n_quarters = int(t.max()) - t0 + 1 if len(t) else 0
+        grid = np.arange(t0, t0 + n_quarters)
+        self.periods = pd.Index([f"{q // 4 - 1}-Q{q % 4 + 1}" for q in grid], name='period')
         
-        latest['quadrant'] = (
-            latest.apply(lambda row:
-                'BEST' if row['casa_pct'] > casa_median and row['gnpa_pct'] < gnpa_median
-                else 'CAUTION' if row['casa_pct'] > casa_median and row['gnpa_pct'] >= gnpa_median
-                else 'WATCH' if row['casa_pct'] <= casa_median and row['gnpa_pct'] < gnpa_median
-                else 'WORST', axis=1)
-        )
+        self._values = {}
+        for metric in self.metrics:
+            matrix = np.full((len(self.banks), n_quarters), np.nan)
+            matrix[bank_codes, t - t0] = df[metric].to_numpy(dtype=float)
+            self._values[metric] = matrix
+    
+    def _frame(self, matrix):
+        return pd.DataFrame(matrix, index=pd.Index(self.banks, name='bank'), columns=self.periods)
+    
+    def _lag_change(self, metric, lag):
+        values = self._values[metric]
+        change = np.full_like(values, np.nan)
+        if values.shape[1] > lag:
+            change[:, lag:] = values[:, lag:] - values[:, :-lag]
+        return change
+    
+    def matrix(self, metric):
+        """banks × quarters values (NaN = missing quarter)"""
+        return self._frame(self._values[metric])
+    
+    def qoq(self, metric):
+        """Change vs the previous quarter (NaN if either quarter is missing)"""
+        return self._frame(self._lag_change(metric, 1))
+    
+    def yoy(self, metric):
+        """Change vs the same quarter a year earlier"""
+        return self._frame(self._lag_change(metric, 4))
+    
+    def _windows(self, metric, window):
+        # (banks, quarters, window) view of the trailing window at every quarter
+        values = self._values[metric]
+        if values.shape[1] == 0:
+            return np.empty(values.shape + (window,))
+        padded = np.hstack([np.full((len(values), window - 1), np.nan), values])
+        return np.lib.stride_tricks.sliding_window_view(padded, window, axis=1)
+    
+    def _rolling_stats(self, metric, window, min_periods):
+        windows = self._windows(metric, window)
+        count = (~np.isnan(windows)).sum(axis=-1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean = np.nansum(windows, axis=-1) / count
+            sq_dev = np.nansum((windows - mean[..., np.newaxis]) ** 2, axis=-1)
+            std = np.sqrt(sq_dev / (count - 1))
+        enough = count >= (window if min_periods is None else min_periods)
+        mean = np.where(enough, mean, np.nan)
+        std = np.where(enough & (count >= 2), std, np.nan)
+        return mean, std
+    
+    def rolling_mean(self, metric, window=4, min_periods=None):
+        """Trailing mean over `window` quarters (missing quarters reduce the count)"""
+        return self._frame(self._rolling_stats(metric, window, min_periods)[0])
+    
+    def rolling_std(self, metric, window=4, min_periods=None):
+        """Trailing volatility (sample std) over `window` quarters"""
+        return self._frame(self._rolling_stats(metric, window, min_periods)[1])
+    
+    def cumulative_change(self, metric):
+        """Change since each bank's first reported quarter"""
+        values = self._values[metric]
+        if values.shape[1] == 0:
+            return self._frame(values.copy())
+        observed = ~np.isnan(values)
+        first_col = np.where(observed.any(axis=1), observed.argmax(axis=1), 0)
+        base = values[np.arange(len(values)), first_col]
+        return self._frame(values - base[:, np.newaxis])
+    
+    def changes(self, window=4, min_periods=None):
+        """
+        Long table of every measure for every metric, one row per reported
+        (bank, quarter): <metric>, _qoq, _yoy, _roll_mean, _roll_std, _cum_change
+        """
+        observed = np.zeros((len(self.banks), len(self.periods)), dtype=bool)
+        for metric in self.metrics:
+            observed |= ~np.isnan(self._values[metric])
+        rows, cols = np.nonzero(observed)
         
-        return latest[['bank', 'casa_pct', 'gnpa_pct', 'quadrant']].sort_values('quadrant')
+        table = {'bank': self.banks[rows], 'period': self.periods[cols]}
+        for metric in self.metrics:
+            roll_mean, roll_std = self._rolling_stats(metric, window, min_periods)
+            measures = {
+                metric: self._values[metric],
+                f'{metric}_qoq': self._lag_change(metric, 1),
+                f'{metric}_yoy': self._lag_change(metric, 4),
+                f'{metric}_roll_mean': roll_mean,
+                f'{metric}_roll_std': roll_std,
+                f'{metric}_cum_change': self.cumulative_change(metric).to_numpy(),
+            }
+            for name, matrix in measures.items():
+                table[name] = matrix[rows, cols]
+        return pd.DataFrame(table)
+
+
+class RankingsCube:
+    """
+    Rank of every bank on every metric in every period
+    
+    Built in one vectorized pass and stored as a (banks, periods, metrics)
+    integer array (0 = no data), so rank history and rank movement
+    queries are array lookups rather than repeated sorts. Rank 1 is best:
+    lowest GNPA/NNPA, highest NIM/CASA/spread.
+    """
+    
+    METRICS = ['gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct', 'spread_bps']
+    HIGHER_IS_BETTER = {'nim_pct', 'casa_pct', 'spread_bps'}
+    TIE_METHODS = ['min', 'max', 'dense', 'first']
+    
+    def __init__(self, data, ties='min'):
+        """
+        Args:
+            data (pd.DataFrame or BankPanel): Tidy table
+            ties (str): Tie handling: 'min' (1,2,2,4), 'max' (1,3,3,4),
+                        'dense' (1,2,2,3) or 'first' (table order)
+        """
+        if ties not in self.TIE_METHODS:
+            raise ValueError(f"ties must be one of {self.TIE_METHODS}")
+        df = BankPanel.wrap(data).df
+        self.ties = ties
+        
+        bank_codes, self.banks = pd.factorize(df['bank'], sort=True)
+        # One column per period_key, except that every unparseable label
+        # (key -1) keeps its own column; columns are ordered by key, then label
+        period_keys = df['period_key'].to_numpy()
+        unparsed = np.where(period_keys < 0, df['period'].astype(str).to_numpy(), '')
+        column_codes, columns = pd.MultiIndex.from_arrays([period_keys, unparsed]).factorize()
+        order = np.lexsort((columns.get_level_values(1), columns.get_level_values(0)))
+        position = np.empty_like(order)
+        position[order] = np.arange(len(order))
+        period_codes = position[column_codes]
+        first_pos = np.unique(column_codes, return_index=True)[1]
+        self.periods = pd.Index(df['period'].to_numpy()[first_pos[order]])
+        
+        self._bank_pos = {bank: i for i, bank in enumerate(self.banks)}
+        self._period_pos = {period: j for j, period in enumerate(self.periods)}
+        self._metric_pos = {metric: k for k, metric in enumerate(self.METRICS)}
+        
+        n_banks, n_periods, n_metrics = len(self.banks), len(self.periods), len(self.METRICS)
+        values = np.full((n_banks, n_periods, n_metrics), np.nan)
+        metric_values = df[self.METRICS[:4]].to_numpy(dtype=float)
+        spread = (metric_values[:, 0] - metric_values[:, 1]) * 100
+        values[bank_codes, period_codes] = np.column_stack([metric_values, spread])
+        
+        # Rank "badness" ascending across banks for every (period, metric)
+        for k, metric in enumerate(self.METRICS):
+            if metric in self.HIGHER_IS_BETTER:
+                values[:, :, k] = -values[:, :, k]
+        flat = pd.DataFrame(values.reshape(n_banks, n_periods * n_metrics))
+        ranks = flat.rank(axis=0, method=ties, na_option='keep').to_numpy()
+        
+        rank_dtype = np.int16 if n_banks < np.iinfo(np.int16).max else np.int32
+        self.ranks = np.nan_to_num(ranks, nan=0).astype(rank_dtype).reshape(values.shape)
+        self.counts = (self.ranks > 0).sum(axis=0).astype(np.int32)
+    
+    def percentiles(self):
+        """Percentile ranks as float32 (100 = best, 0 = worst, NaN = no data)"""
+        counts = self.counts[np.newaxis, :, :].astype(np.float32)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct = np.where(counts > 1, (counts - self.ranks) / (counts - 1) * 100, 100.0)
+        return np.where(self.ranks > 0, pct, np.nan).astype(np.float32)
+    
+    def rank(self, bank, period, metric):
+        """Rank of one bank (0 if no data)"""
+        return int(self.ranks[self._bank_pos[bank], self._period_pos[period], self._metric_pos[metric]])
+    
+    def history(self, bank, metric):
+        """Rank of a bank in every period (NaN where missing)"""
+        ranks = self.ranks[self._bank_pos[bank], :, self._metric_pos[metric]].astype(float)
+        ranks[ranks == 0] = np.nan
+        return pd.Series(ranks, index=self.periods, name=metric)
+    
+    def cross_section(self, period, metric):
+        """All ranked banks in one period for one metric, best first"""
+        j, k = self._period_pos[period], self._metric_pos[metric]
+        ranks = self.ranks[:, j, k]
+        has_data = ranks > 0
+        table = pd.DataFrame({'bank': self.banks[has_data], 'rank': ranks[has_data]})
+        return table.sort_values(['rank', 'bank']).reset_index(drop=True)
+    
+    def movement(self, metric, from_period, to_period):
+        """
+        Rank change per bank between two periods (positive = improved)
+        
+        Only banks with data in both periods are returned.
+        """
+        k = self._metric_pos[metric]
+        before = self.ranks[:, self._period_pos[from_period], k]
+        after = self.ranks[:, self._period_pos[to_period], k]
+        both = (before > 0) & (after > 0)
+        table = pd.DataFrame({
+            'bank': self.banks[both],
+            'rank_from': before[both],
+            'rank_to': after[both],
+            'change': before[both].astype(np.int32) - after[both],
+        })
+        return table.sort_values('change', ascending=False).reset_index(drop=True)
 
 
 # ===== MAIN EXECUTION =====
@@ -112,18 +522,20 @@ if __name__ == "__main__":
     
     # Load validated data
     try:
-        df = pd.read_csv('bank_metrics_validated.csv')
-        print(f"✅ Loaded {len(df)} rows from bank_metrics_validated.csv\n")
+        table_path = find_table('bank_metrics_validated')
+        df = load_table(table_path)
+        print(f"✅ Loaded {len(df)} rows from {table_path}\n")
     except FileNotFoundError:
         print("❌ File not found: bank_metrics_validated.csv")
         print("   Run step4_validate.py first")
         import sys
         sys.exit(1)
     
-    # Initialize analytics engines
-    asset_quality = AssetQualityAnalytics(df)
-    profitability = ProfitabilityAnalytics(df)
-    peer = PeerComparisonAnalytics(df)
+    # Initialize analytics engines (sharing one panel)
+    panel = BankPanel(df)
+    asset_quality = AssetQualityAnalytics(panel)
+    profitability = ProfitabilityAnalytics(panel)
+    peer = PeerComparisonAnalytics(panel)
     
     # ===== A) ASSET QUALITY =====
     print("="*70)
@@ -200,6 +612,12 @@ if __name__ == "__main__":
     spread.to_csv('analytics_spread.csv', index=False)
     print("✅ Spread analysis saved to: analytics_spread.csv")
     
+    # Build dashboard artifacts (read by app.py)
+    from artifacts import ArtifactStore
+    store = ArtifactStore()
+    store.build_or_load(panel)
+    print(f"✅ Dashboard artifacts saved to: {store.path(panel.data_hash)}")
+    
     print("\n" + "="*70)
     print("✅ STEP 5 COMPLETE")
     print("="*70)
@@ -207,6 +625,7 @@ if __name__ == "__main__":
     print("  1. analytics_rankings.csv - Full rankings")
     print("  2. analytics_quadrant.csv - Quadrant positioning")
     print("  3. analytics_spread.csv - NPA spread analysis")
+    print("  4. artifacts/ - Precomputed dashboard aggregates")
     print("\nNext steps:")
     print("  Run: streamlit run app.py")
     print("="*70 + "\n")
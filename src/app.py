@@ -20,6 +20,15 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime
+from pathlib import Path
+
+from data_model import (find_table, load_table, table_columns, sort_periods,
+                        ensure_mmap, open_mmap, table_signature, export_table,
+                        SCHEMA, PANEL_COLUMNS, PERIOD_COLUMNS)
+from panel import BankPanel
+from artifacts import ArtifactStore
+from analytics import classify_quadrants, RankingsCube
+from charts import downsample_series, bin_scatter
 
 # ===== PAGE CONFIGURATION =====
 st.set_page_config(
@@ -30,14 +39,113 @@ st.set_page_config(
 )
 
 # ===== LOAD DATA =====
-@st.cache_data
-def load_data():
-    """Load validated data"""
+DATA_STEM = 'bank_metrics_validated'
+MMAP_PATH = 'bank_metrics_validated.mmap.arrow'
+
+# Shared mode: the validated table is materialised once as a memory-mapped
+# Arrow file that every session/process maps zero-copy. Set to False to
+# fall back to a per-session st.cache_data copy.
+USE_SHARED_MMAP = True
+
+
+def data_source():
+    """Path of the validated table (Parquet if available, else CSV), or None"""
     try:
-        df = pd.read_csv('bank_metrics_validated.csv')
-        return df
+        return find_table(DATA_STEM)
     except FileNotFoundError:
+        return None
+
+
+@st.cache_data
+def load_data():
+    """Load the panel columns of the validated data (weights if present)"""
+    source = data_source()
+    if source is None:
         return pd.DataFrame()
+    available = table_columns(source)
+    return load_table(source, columns=[col for col in PANEL_COLUMNS if col in available], compact=True)
+
+
+@st.cache_resource(max_entries=2)
+def load_source_panel(signature):
+    """
+    Every SCHEMA column, free text included, as an indexed panel for the
+    Data & Sources page (all other pages use the PANEL_COLUMNS panel).
+    Read once per data version: keyed by the source file signature so a
+    rewritten file is re-read.
+    """
+    return BankPanel(load_table(signature[0], columns=list(SCHEMA), compact=True), copy=False)
+
+
+@st.cache_resource(max_entries=2)
+def load_shared_panel(signature):
+    """
+    Read-only panel over the memory-mapped table, shared by all sessions.
+    Keyed by the file signature so a rewritten file is re-mapped.
+    """
+    # WEIGHT_COLUMN is mapped only if the table has it (weighted aggregates)
+    df = open_mmap(signature[0], columns=PANEL_COLUMNS + list(PERIOD_COLUMNS))
+    return BankPanel(df, copy=False)
+
+
+def load_panel():
+    """Panel for this rerun (shared mmap or per-session copy)"""
+    source = data_source()
+    if source is None or not USE_SHARED_MMAP:
+        return BankPanel(load_data(), copy=False)
+    ensure_mmap(source, MMAP_PATH)
+    return load_shared_panel(table_signature(MMAP_PATH))
+
+
+ARTIFACT_ROOT = 'artifacts'
+
+
+@st.cache_resource(max_entries=2)
+def load_artifacts(digest, _panel):
+    """Precomputed page aggregates for this data version (built on a miss)"""
+    return ArtifactStore(ARTIFACT_ROOT).build_or_load(_panel)
+
+
+@st.cache_resource(max_entries=2)
+def load_rankings_cube(digest, _panel):
+    """Rank of every bank on every metric in every period"""
+    return RankingsCube(_panel)
+
+
+EXPORT_ROOT = 'exports'
+EXPORT_FILES = {'csv': 'bank_metrics.csv.gz', 'parquet': 'bank_metrics.parquet'}
+RAW_PAGE_SIZES = [50, 100, 500]
+
+
+@st.cache_resource(max_entries=2)
+def build_exports(digest, _panel):
+    """
+    Download files for this data version (hash of all SCHEMA columns,
+    text included), written once under exports/<hash>/ and shared by
+    every session
+    """
+    out_dir = Path(EXPORT_ROOT) / digest
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {}
+    for fmt, name in EXPORT_FILES.items():
+        paths[fmt] = out_dir / name
+        if not paths[fmt].exists():
+            export_table(_panel.df[list(SCHEMA)], paths[fmt])
+    return paths
+
+
+@st.cache_resource(max_entries=256)
+def cached_figure(page, selection, digest, _build):
+    """
+    Plotly figure for (page, selection, data version), built once and
+    reused by every rerun and session. _build is not hashed.
+    """
+    return _build()
+
+
+def fmt_value(value, spec):
+    """Format a caption number, or 'n/a' if missing (e.g. no year-ago quarter)"""
+    return 'n/a' if pd.isna(value) else format(value, spec)
 
 # ===== THEME & STYLING =====
 st.markdown("""
@@ -52,12 +160,16 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Load data
-df = load_data()
+panel = load_panel()
+df = panel.df
 
 if len(df) == 0:
     st.error("❌ No data found. Please run steps 1-5 first.")
     st.stop()
 
+artifacts = load_artifacts(panel.data_hash, panel)
+source_signature = table_signature(data_source())
+
 # ===== SIDEBAR NAVIGATION =====
 st.sidebar.title("📊 NPA Dashboard")
 st.sidebar.markdown("---")
@@ -69,7 +181,7 @@ page = st.sidebar.radio(
 
 st.sidebar.markdown("---")
 st.sidebar.info(f"📌 Data: {len(df)} rows | Banks: {df['bank'].nunique()} | "
-                f"Latest: {df['period'].max()}")
+                f"Latest: {panel.latest_period}")
 
 # ===== PAGE 1: OVERVIEW =====
 if page == "📈 Overview":
@@ -77,32 +189,34 @@ if page == "📈 Overview":
     st.markdown("*Source: NSE/BSE filings | Last updated: 2026-01-18*")
     
     # Get latest period data
-    latest_period = df['period'].max()
-    latest_data = df[df['period'] == latest_period]
+    latest_period = panel.latest_period
+    latest_data = artifacts['latest_period']
+    system_trend = artifacts['system_trend']
     
     if len(latest_data) == 0:
         st.warning("No data for latest period")
     else:
         # KPI Cards
+        kpis = system_trend[system_trend['period'] == latest_period].iloc[0]
         col1, col2, col3, col4 = st.columns(4)
         
         with col1:
-            avg_gnpa = latest_data['gnpa_pct'].mean()
+            avg_gnpa = kpis['gnpa_pct']
             st.metric("🔴 Avg GNPA%", f"{avg_gnpa:.2f}%", 
                      delta=None, help="Gross NPA percentage")
         
         with col2:
-            avg_nnpa = latest_data['nnpa_pct'].mean()
+            avg_nnpa = kpis['nnpa_pct']
             st.metric("🟡 Avg NNPA%", f"{avg_nnpa:.2f}%",
                      delta=None, help="Net NPA percentage")
         
         with col3:
-            avg_nim = latest_data['nim_pct'].mean()
+            avg_nim = kpis['nim_pct']
             st.metric("💰 Avg NIM%", f"{avg_nim:.2f}%",
                      delta=None, help="Net Interest Margin")
         
         with col4:
-            avg_casa = latest_data['casa_pct'].mean()
+            avg_casa = kpis['casa_pct']
             st.metric("🏦 Avg CASA%", f"{avg_casa:.2f}%",
                      delta=None, help="Current Account Saving Account")
         
@@ -124,35 +238,60 @@ if page == "📈 Overview":
         # System trend
         st.subheader("📈 System Trends")
         
-        periods = df['period'].unique()[:min(4, len(df['period'].unique()))]
-        trend_data = df[df['period'].isin(periods)].groupby('period').agg({
-            'gnpa_pct': 'mean',
-            'nim_pct': 'mean'
-        }).reset_index()
+        # Precomputed per data version; system_trend is in chronological
+        # order, so the last N periods are its tail
+        col1, col2 = st.columns(2)
+        with col1:
+            n_periods = len(system_trend)
+            if n_periods > 2:
+                n_periods = st.slider("Periods:", 2, n_periods, min(4, n_periods), key='trend_periods')
+        with col2:
+            stats = {"Mean": "", "Median": "_median"}
+            if 'gnpa_pct_weighted' in system_trend.columns:
+                stats["Asset-weighted"] = "_weighted"
+            stat = st.radio("Aggregate:", list(stats), horizontal=True, key='trend_stat')
+        
+        y_cols = [f'gnpa_pct{stats[stat]}', f'nim_pct{stats[stat]}']
+        trend_data = system_trend.tail(n_periods)[['period'] + y_cols]
         
-        fig_trend = px.line(
-            trend_data, 
+        fig_trend = cached_figure(page, ('system_trend', n_periods, stat), panel.data_hash, lambda: px.line(
+            downsample_series(trend_data, y_cols),
             x='period', 
-            y=['gnpa_pct', 'nim_pct'],
+            y=y_cols,
             markers=True,
-            title="Average GNPA% and NIM% Trend",
-            labels={'gnpa_pct': 'Avg GNPA%', 'nim_pct': 'Avg NIM%'},
+            title=f"{stat} GNPA% and NIM% Trend",
+            labels={y_cols[0]: f'{stat} GNPA%', y_cols[1]: f'{stat} NIM%'},
             line_shape='linear'
-        )
+        ))
         st.plotly_chart(fig_trend, use_container_width=True)
+        
+        latest_row = system_trend.iloc[-1]
+        st.caption(f"Dispersion in {latest_row['period']}: "
+                   f"GNPA std {fmt_value(latest_row['gnpa_pct_std'], '.2f')} pp, "
+                   f"IQR {fmt_value(latest_row['gnpa_pct_iqr'], '.2f')} pp | "
+                   f"NIM std {fmt_value(latest_row['nim_pct_std'], '.2f')} pp, "
+                   f"IQR {fmt_value(latest_row['nim_pct_iqr'], '.2f')} pp | {latest_row['n_banks']} banks")
 
 # ===== PAGE 2: BANK DEEP DIVE =====
 elif page == "🏦 Bank Deep Dive":
     st.title("🏦 Bank Deep Dive Analysis")
     
     # Bank selector
-    selected_bank = st.selectbox("Select Bank:", sorted(df['bank'].unique()))
+    selected_bank = st.selectbox("Select Bank:", sorted(panel.bank_positions))
     
-    bank_data = df[df['bank'] == selected_bank].sort_values('period')
+    bank_data = panel.bank_rows(selected_bank)
     
     if len(bank_data) > 0:
         # Latest metrics
         latest = bank_data.iloc[-1]
+        summary = artifacts['bank_trends'].set_index('bank').loc[selected_bank]
+        st.caption(f"GNPA trend: {summary['trend']} | "
+                   f"Range: {fmt_value(summary['gnpa_pct_min'], '.2f')}% - "
+                   f"{fmt_value(summary['gnpa_pct_max'], '.2f')}% | "
+                   f"QoQ: {fmt_value(summary['gnpa_pct_qoq'], '+.2f')} pp | "
+                   f"YoY: {fmt_value(summary['gnpa_pct_yoy'], '+.2f')} pp | "
+                   f"Slope: {fmt_value(summary['gnpa_pct_slope'], '+.3f')} pp/quarter | "
+                   f"{summary['n_periods']} periods")
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -165,31 +304,31 @@ elif page == "🏦 Bank Deep Dive":
             st.metric("CASA%", f"{latest['casa_pct']:.2f}%")
         
         # NPA Trend
-        fig_npa = px.line(
-            bank_data,
+        fig_npa = cached_figure(page, ('npa', selected_bank), panel.data_hash, lambda: px.line(
+            downsample_series(bank_data, ['gnpa_pct', 'nnpa_pct']),
             x='period',
             y=['gnpa_pct', 'nnpa_pct'],
             markers=True,
             title=f"{selected_bank} - NPA Trend",
             labels={'gnpa_pct': 'GNPA%', 'nnpa_pct': 'NNPA%'}
-        )
+        ))
         st.plotly_chart(fig_npa, use_container_width=True)
         
         # Profitability
-        fig_prof = px.line(
-            bank_data,
+        fig_prof = cached_figure(page, ('profitability', selected_bank), panel.data_hash, lambda: px.line(
+            downsample_series(bank_data, ['nim_pct', 'casa_pct']),
             x='period',
             y=['nim_pct', 'casa_pct'],
             markers=True,
             title=f"{selected_bank} - Profitability & Funding",
             labels={'nim_pct': 'NIM%', 'casa_pct': 'CASA%'}
-        )
+        ))
         st.plotly_chart(fig_prof, use_container_width=True)
         
         # Data table
         st.subheader("Quarterly Data")
         display_cols = ['period', 'gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
-        st.dataframe(bank_data[display_cols].sort_values('period', ascending=False), 
+        st.dataframe(bank_data.sort_values('period_key', ascending=False)[display_cols], 
                     use_container_width=True)
     else:
         st.warning(f"No data found for {selected_bank}")
@@ -201,25 +340,20 @@ elif page == "🏆 Peer Compare":
     # Metric selector
     metric = st.radio("Select Metric:", ["GNPA% (Lower is Better)", "NIM% (Higher is Better)", "CASA% (Higher is Better)"])
     
-    latest = df.loc[df.groupby('bank')['period'].idxmax()]
-    
     if metric == "GNPA% (Lower is Better)":
         col_name = 'gnpa_pct'
-        ascending = True
         title = "Lowest GNPA% - Best Asset Quality"
     elif metric == "NIM% (Higher is Better)":
         col_name = 'nim_pct'
-        ascending = False
         title = "Highest NIM% - Best Profitability"
     else:
         col_name = 'casa_pct'
-        ascending = False
         title = "Highest CASA% - Best Funding"
     
-    sorted_data = latest.sort_values(col_name, ascending=ascending)
+    sorted_data = artifacts[f'rankings_{col_name}']
     
     # Bar chart
-    fig_bar = px.bar(
+    fig_bar = cached_figure(page, ('rankings', col_name), panel.data_hash, lambda: px.bar(
         sorted_data,
         x='bank',
         y=col_name,
@@ -227,71 +361,139 @@ elif page == "🏆 Peer Compare":
         color=col_name,
         color_continuous_scale='RdYlGn_r' if metric == "GNPA% (Lower is Better)" else 'RdYlGn',
         labels={col_name: metric.split('(')[0].strip()}
-    )
+    ))
     st.plotly_chart(fig_bar, use_container_width=True)
     
+    # Rank history and movement
+    cube = load_rankings_cube(panel.data_hash, panel)
+    if len(cube.periods) >= 2:
+        st.subheader("📊 Rank Movement")
+        prev_period, last_period = cube.periods[-2], cube.periods[-1]
+        
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write(f"**Change in rank: {prev_period} → {last_period}**")
+            st.dataframe(cube.movement(col_name, prev_period, last_period),
+                         use_container_width=True)
+        with col2:
+            history_bank = st.selectbox("Rank history for:", list(cube.banks), key='rank_history_bank')
+            
+            def build_rank_figure():
+                history = cube.history(history_bank, col_name).rename('rank').reset_index()
+                history.columns = ['period', 'rank']
+                fig = px.line(downsample_series(history, ['rank']), x='period', y='rank', markers=True,
+                              title=f"{history_bank} - Rank History (1 = best)")
+                fig.update_yaxes(autorange='reversed')
+                return fig
+            
+            fig_rank = cached_figure(page, ('rank_history', history_bank, col_name),
+                                     panel.data_hash, build_rank_figure)
+            st.plotly_chart(fig_rank, use_container_width=True)
+    
     # Quadrant analysis
     st.subheader("📍 Quadrant View: CASA vs GNPA")
     st.markdown("**Best position: Top-Right (High CASA + Low GNPA)**")
     
-    fig_scatter = px.scatter(
-        latest,
-        x='casa_pct',
-        y='gnpa_pct',
-        hover_name='bank',
-        size_max=30,
-        title="CASA% vs GNPA%",
-        labels={'casa_pct': 'CASA%', 'gnpa_pct': 'GNPA%'},
-        text='bank'
-    )
+    split = st.selectbox("Split quadrants at:", ["median", "mean", "percentile"], key='quadrant_split')
+    q = st.slider("Percentile:", 10, 90, 50, step=5) if split == "percentile" else 50
+    if split == "median":
+        quadrant = artifacts['quadrant']
+    else:
+        quadrant = artifacts['latest'].copy()
+        quadrant['quadrant'] = classify_quadrants(quadrant, 'casa_pct', 'gnpa_pct',
+                                                  split=split, q=q, by=None)['quadrant']
     
-    fig_scatter.update_traces(textposition='top center')
+    def build_quadrant_figure():
+        points = bin_scatter(quadrant, 'casa_pct', 'gnpa_pct')
+        binned = len(points) < len(quadrant)
+        fig = px.scatter(
+            points,
+            x='casa_pct',
+            y='gnpa_pct',
+            hover_name='bank',
+            color=None if binned else 'quadrant',
+            size='count' if binned else None,
+            size_max=30,
+            title="CASA% vs GNPA%" + (" (binned)" if binned else ""),
+            labels={'casa_pct': 'CASA%', 'gnpa_pct': 'GNPA%'},
+            text=None if binned else 'bank'
+        )
+        if not binned:
+            fig.update_traces(textposition='top center')
+        return fig
+    
+    fig_scatter = cached_figure(page, ('quadrant', split, q), panel.data_hash, build_quadrant_figure)
     st.plotly_chart(fig_scatter, use_container_width=True)
     
     # Quadrant breakdown
-    casa_median = latest['casa_pct'].median()
-    gnpa_median = latest['gnpa_pct'].median()
-    
     st.subheader("Quadrant Breakdown")
     
+    banks_in = {q: quadrant.loc[quadrant['quadrant'] == q, 'bank'].tolist()
+                for q in ['BEST', 'CAUTION', 'WATCH', 'WORST']}
+    
     col1, col2 = st.columns(2)
     
     with col1:
-        best = latest[(latest['casa_pct'] > casa_median) & (latest['gnpa_pct'] < gnpa_median)]['bank'].tolist()
-        caution = latest[(latest['casa_pct'] > casa_median) & (latest['gnpa_pct'] >= gnpa_median)]['bank'].tolist()
+        best, caution = banks_in['BEST'], banks_in['CAUTION']
         
         st.success(f"✅ **BEST** (High CASA + Low GNPA): {', '.join(best) if best else 'None'}")
         st.warning(f"⚠️ **CAUTION** (High CASA + High GNPA): {', '.join(caution) if caution else 'None'}")
     
     with col2:
-        watch = latest[(latest['casa_pct'] <= casa_median) & (latest['gnpa_pct'] < gnpa_median)]['bank'].tolist()
-        worst = latest[(latest['casa_pct'] <= casa_median) & (latest['gnpa_pct'] >= gnpa_median)]['bank'].tolist()
+        watch, worst = banks_in['WATCH'], banks_in['WORST']
         
         st.info(f"🔍 **WATCH** (Low CASA + Low GNPA): {', '.join(watch) if watch else 'None'}")
         st.error(f"❌ **WORST** (Low CASA + High GNPA): {', '.join(worst) if worst else 'None'}")
     
     # Full rankings table
     st.subheader("Full Rankings Table")
-    rankings = latest.sort_values('gnpa_pct')[['bank', 'gnpa_pct', 'nim_pct', 'casa_pct']]
+    rankings = artifacts['rankings_gnpa_pct'][['bank', 'gnpa_pct', 'nim_pct', 'casa_pct']]
     st.dataframe(rankings, use_container_width=True)
 
 # ===== PAGE 4: DATA & SOURCES =====
 elif page == "📚 Data & Sources":
     st.title("📚 Data & Sources")
     
-    # Raw data
+    # Raw data (the only page that reads the text columns), one page of
+    # rows at a time so the browser never receives the whole table
+    source_panel = load_source_panel(source_signature)
+    n_rows = len(source_panel)
     st.subheader("Raw Data")
-    st.dataframe(df, use_container_width=True)
     
-    # Download
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        page_size = st.selectbox("Rows per page:", RAW_PAGE_SIZES, key='raw_page_size')
+    n_pages = max(1, -(-n_rows // page_size))
+    with col2:
+        raw_page = st.number_input(f"Page (of {n_pages}):", min_value=1, max_value=n_pages,
+                                   value=1, key='raw_page')
+    start = (raw_page - 1) * page_size
+    st.dataframe(source_panel.df.iloc[start:start + page_size][list(SCHEMA)],
+                 use_container_width=True)
+    st.caption(f"Rows {start + 1}-{min(start + page_size, n_rows)} of {n_rows}")
+    
+    # Download (files pre-built once per data version)
     st.subheader("📥 Download")
-    csv = df.to_csv(index=False)
-    st.download_button(
-        label="Download CSV",
-        data=csv,
-        file_name=f"bank_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-        mime="text/csv"
-    )
+    exports = build_exports(source_panel.content_hash(SCHEMA), source_panel)
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        with open(exports['csv'], 'rb') as f:
+            st.download_button(
+                label="Download CSV (gzip)",
+                data=f,
+                file_name=f"bank_metrics_{stamp}.csv.gz",
+                mime="application/gzip"
+            )
+    with col2:
+        with open(exports['parquet'], 'rb') as f:
+            st.download_button(
+                label="Download Parquet",
+                data=f,
+                file_name=f"bank_metrics_{stamp}.parquet",
+                mime="application/octet-stream"
+            )
     
     # Source attribution
     st.subheader("📖 Source Attribution")
@@ -299,12 +501,12 @@ elif page == "📚 Data & Sources":
     col1, col2 = st.columns([1, 1])
     
     with col1:
-        selected_bank = st.selectbox("Select Bank:", sorted(df['bank'].unique()), key='bank_select')
+        selected_bank = st.selectbox("Select Bank:", sorted(source_panel.bank_positions), key='bank_select')
     
     with col2:
-        selected_period = st.selectbox("Select Period:", sorted(df['period'].unique(), reverse=True), key='period_select')
+        selected_period = st.selectbox("Select Period:", sort_periods(source_panel.period_positions, reverse=True), key='period_select')
     
-    record = df[(df['bank'] == selected_bank) & (df['period'] == selected_period)]
+    record = source_panel.lookup(selected_bank, selected_period)
     
     if len(record) > 0:
         r = record.iloc[0]
@@ -0,0 +1,216 @@
+"""
+ANALYTICS ARTIFACTS - Precomputed page-level aggregates
+=========================================================
+Project: NPA Analysis Dashboard
+
+Everything the dashboard pages show (latest snapshot, rankings per metric,
+quadrants, spreads, system trend series, per-bank trend summaries) is
+built once per input dataset and stored as Parquet files under
+artifacts/v<version>-<data_hash>/. Widget interactions then become lookups.
+
+The key is BankPanel.data_hash plus ARTIFACT_VERSION, so changed data or a
+changed artifact layout gets a fresh directory.
+"""
+
+import json
+import pandas as pd
+import numpy as np
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from .data_model import WEIGHT_COLUMN
+    from .panel import BankPanel
+    from .analytics import AssetQualityAnalytics, PeerComparisonAnalytics
+except ImportError:  # run as a script from src/
+    from data_model import WEIGHT_COLUMN
+    from panel import BankPanel
+    from analytics import AssetQualityAnalytics, PeerComparisonAnalytics
+
+# Bump when the set or layout of artifacts changes
+ARTIFACT_VERSION = 4
+
+METRICS = ['gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
+
+# Metrics where a lower value ranks better
+LOWER_IS_BETTER = {'gnpa_pct', 'nnpa_pct'}
+
+
+def _metric_rankings(latest, metric):
+    ascending = metric in LOWER_IS_BETTER
+    ranked = latest[['bank', 'period'] + METRICS].sort_values(metric, ascending=ascending)
+    ranked['rank'] = np.arange(1, len(ranked) + 1)
+    return ranked.reset_index(drop=True)
+
+
+def system_trend(df, periods=None):
+    """
+    Cross-bank aggregates for every period and metric
+    
+    Columns per metric: <metric> (mean), <metric>_median, <metric>_std and
+    <metric>_iqr (dispersion), plus <metric>_weighted (WEIGHT_COLUMN-
+    weighted mean) when the table has exposures. n_banks counts banks
+    reporting in the period. Rows are in chronological order, so the last
+    N periods are trend.tail(N).
+    
+    Args:
+        df (pd.DataFrame): Tidy table with period columns
+        periods (list): Restrict to these periods (default: all)
+    """
+    if periods is not None:
+        df = df[df['period'].isin(periods)]
+    grouped = df.groupby('period', observed=True)
+    
+    aggs = {'period_key': ('period_key', 'first'), 'n_banks': ('bank', 'nunique')}
+    for metric in METRICS:
+        aggs[metric] = (metric, 'mean')
+        aggs[f'{metric}_median'] = (metric, 'median')
+        aggs[f'{metric}_std'] = (metric, 'std')
+    trend = grouped.agg(**aggs)
+    
+    iqr = grouped[METRICS].quantile(0.75) - grouped[METRICS].quantile(0.25)
+    for metric in METRICS:
+        trend[f'{metric}_iqr'] = iqr[metric]
+    
+    if WEIGHT_COLUMN in df.columns:
+        weights = df[WEIGHT_COLUMN].to_numpy(dtype=float)
+        terms = {'period': df['period']}
+        for metric in METRICS:
+            x = df[metric].to_numpy(dtype=float)
+            w = np.where(np.isnan(x), np.nan, weights)
+            terms[f'{metric}__wx'] = w * x
+            terms[f'{metric}__w'] = w
+        sums = pd.DataFrame(terms).groupby('period', observed=True).sum(min_count=1)
+        for metric in METRICS:
+            trend[f'{metric}_weighted'] = sums[f'{metric}__wx'] / sums[f'{metric}__w']
+    
+    return trend.reset_index().sort_values('period_key', kind='stable').reset_index(drop=True)
+
+
+def build_artifacts(data):
+    """
+    Compute every page-level aggregate in one pass
+
+    Args:
+        data (pd.DataFrame or BankPanel): Validated tidy table
+
+    Returns:
+        dict: artifact name -> DataFrame
+    """
+    panel = BankPanel.wrap(data)
+    asset_quality = AssetQualityAnalytics(panel)
+    peer = PeerComparisonAnalytics(panel)
+
+    latest = panel.latest().reset_index(drop=True)
+    artifacts = {
+        'latest': latest[['bank', 'period', 'period_key'] + METRICS],
+        'latest_period': panel.period_rows(panel.latest_period)[['bank', 'period'] + METRICS]
+                              .reset_index(drop=True),
+        'quadrant': peer.quadrant_view().reset_index(drop=True),
+        'quadrant_history': peer.quadrant_history().reset_index(drop=True),
+        'spread': asset_quality.spread_analysis().reset_index(drop=True),
+        'system_trend': system_trend(panel.df),
+        'bank_trends': asset_quality.trend_summary(),
+    }
+    for metric in METRICS:
+        artifacts[f'rankings_{metric}'] = _metric_rankings(latest, metric)
+    return artifacts
+
+
+def _replace_rows(frame, key, values, fresh):
+    kept = frame[~frame[key].isin(values)]
+    return pd.concat([kept, fresh], ignore_index=True).sort_values(
+        'period_key' if key == 'period' else key, kind='stable').reset_index(drop=True)
+
+
+def update_artifacts(artifacts, panel, delta):
+    """
+    Refresh artifacts after panel.upsert(delta) without a full rebuild
+    
+    Snapshot-based artifacts (latest, rankings, quadrant, spread) are
+    recomputed from the patched latest index, which costs O(banks).
+    Per-bank trend summaries, system trend rows and per-period quadrants
+    are recomputed only for the banks and periods present in delta. latest_period is rebuilt only
+    if the latest period itself changed.
+    
+    Returns:
+        dict: Updated artifacts (same layout as build_artifacts)
+    """
+    asset_quality = AssetQualityAnalytics(panel)
+    peer = PeerComparisonAnalytics(panel)
+    banks = pd.unique(delta['bank'])
+    periods = pd.unique(delta['period'])
+    
+    updated = dict(artifacts)
+    latest = panel.latest().reset_index(drop=True)
+    updated['latest'] = latest[['bank', 'period', 'period_key'] + METRICS]
+    updated['quadrant'] = peer.quadrant_view().reset_index(drop=True)
+    updated['spread'] = asset_quality.spread_analysis().reset_index(drop=True)
+    for metric in METRICS:
+        updated[f'rankings_{metric}'] = _metric_rankings(latest, metric)
+    
+    updated['bank_trends'] = _replace_rows(
+        artifacts['bank_trends'], 'bank', banks, asset_quality.trend_summary(banks))
+    updated['system_trend'] = _replace_rows(
+        artifacts['system_trend'], 'period', periods, system_trend(panel.df, periods))
+    affected = panel.df[panel.df['period'].isin(periods)]
+    updated['quadrant_history'] = _replace_rows(
+        artifacts['quadrant_history'], 'period', periods,
+        PeerComparisonAnalytics(affected).quadrant_history())
+    
+    latest_period = panel.latest_period
+    stale = (len(artifacts['latest_period']) == 0 or
+             artifacts['latest_period']['period'].iloc[0] != latest_period or
+             latest_period in set(periods))
+    if stale:
+        rows = panel.df[panel.df['period'].to_numpy() == latest_period]
+        updated['latest_period'] = rows[['bank', 'period'] + METRICS].reset_index(drop=True)
+    return updated
+
+
+class ArtifactStore:
+    """Versioned on-disk store of analytics artifacts keyed by data hash"""
+
+    def __init__(self, root='artifacts'):
+        self.root = Path(root)
+
+    def key(self, digest):
+        return f"v{ARTIFACT_VERSION}-{digest}"
+
+    def path(self, digest):
+        return self.root / self.key(digest)
+
+    def exists(self, digest):
+        return (self.path(digest) / 'manifest.json').exists()
+
+    def save(self, digest, artifacts):
+        """Write artifacts as Parquet plus a manifest (written last)"""
+        out_dir = self.path(digest)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name, frame in artifacts.items():
+            frame.to_parquet(out_dir / f"{name}.parquet", index=False)
+        manifest = {
+            'data_hash': digest,
+            'artifact_version': ARTIFACT_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'artifacts': sorted(artifacts),
+        }
+        (out_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2))
+        return out_dir
+
+    def load(self, digest, names=None):
+        """Load some or all artifacts for a data hash"""
+        in_dir = self.path(digest)
+        manifest = json.loads((in_dir / 'manifest.json').read_text())
+        names = manifest['artifacts'] if names is None else names
+        return {name: pd.read_parquet(in_dir / f"{name}.parquet") for name in names}
+
+    def build_or_load(self, data):
+        """Load artifacts for data, building and saving them on a miss"""
+        panel = BankPanel.wrap(data)
+        digest = panel.data_hash
+        if self.exists(digest):
+            return self.load(digest)
+        artifacts = build_artifacts(panel)
+        self.save(digest, artifacts)
+        return artifacts
@@ -217,9 +217,9 @@ def print_collection_plan():
     print("="*70 + "\n")
 
 
-def create_bank_directory():
-    """Create bank directory CSV"""
-    banks = get_all_banks(include_optional=False)
+def bank_directory(include_optional=False):
+    """Bank metadata as a DataFrame, sorted by category and code"""
+    banks = get_all_banks(include_optional=include_optional)
     
     data = []
     for code, info in banks.items():
@@ -233,7 +233,12 @@ def create_bank_directory():
         })
     
     df = pd.DataFrame(data)
-    df = df.sort_values(['category', 'bank_code'])
+    return df.sort_values(['category', 'bank_code'])
+
+
+def create_bank_directory():
+    """Create bank directory CSV"""
+    df = bank_directory()
     df.to_csv('bank_directory.csv', index=False)
     
     print("✅ bank_directory.csv created\n")
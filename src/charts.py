@@ -0,0 +1,99 @@
+"""
+CHART DATA - Bounded plot payloads for the dashboard
+=====================================================
+Project: NPA Analysis Dashboard
+
+Plotly serialises every point it is given, so long histories and
+many-bank scatters are reduced before plotting:
+- Trend lines: Largest-Triangle-Three-Buckets (LTTB) keeps the points
+  that preserve the visual shape, at most MAX_LINE_POINTS per series.
+- Scatters: above MAX_SCATTER_POINTS, points are binned on a grid and
+  each occupied cell becomes one marker sized by its bank count.
+"""
+
+import pandas as pd
+import numpy as np
+
+MAX_LINE_POINTS = 500
+MAX_SCATTER_POINTS = 2000
+SCATTER_BINS = 40
+
+
+def lttb(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets downsampling
+
+    Args:
+        x, y (array-like): Series coordinates (no NaN, x increasing)
+        n_out (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Positions of the kept points (first and last always kept)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets between the fixed first and last points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_series(df, ys, max_points=MAX_LINE_POINTS):
+    """
+    Rows of an ordered time series to plot, at most max_points per column
+
+    Each column in ys is reduced with LTTB over row position (missing
+    values skipped); the union of kept rows is returned in order.
+
+    Args:
+        df (pd.DataFrame): Rows in plotting order
+        ys (list): Value columns
+        max_points (int): Points kept per column
+
+    Returns:
+        pd.DataFrame: Subset of df
+    """
+    if len(df) <= max_points:
+        return df
+    keep = []
+    for col in ys:
+        values = df[col].to_numpy(dtype=float)
+        valid = np.flatnonzero(~np.isnan(values))
+        keep.append(valid[lttb(valid, values[valid], max_points)])
+    return df.iloc[np.unique(np.concatenate(keep))]
+
+
+def bin_scatter(df, x, y, label='bank', max_points=MAX_SCATTER_POINTS, bins=SCATTER_BINS):
+    """
+    Scatter data with at most max_points markers
+
+    Small frames are returned unchanged (with count = 1). Larger ones are
+    binned on a bins × bins grid: one row per occupied cell at the mean
+    x/y of its members, with count and a "<n> banks" label.
+
+    Returns:
+        pd.DataFrame: x, y, label and count columns
+    """
+    if len(df) <= max_points:
+        return df.assign(count=1)
+    data = df[[x, y]].dropna()
+    cells = [pd.cut(data[x], bins, labels=False).rename('x_bin'),
+             pd.cut(data[y], bins, labels=False).rename('y_bin')]
+    binned = data.groupby(cells).agg(**{x: (x, 'mean'), y: (y, 'mean'), 'count': (x, 'size')})
+    binned = binned.reset_index(drop=True)
+    binned[label] = binned['count'].astype(str) + ' banks'
+    return binned
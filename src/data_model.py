@@ -18,7 +18,13 @@ This module defines the core data structure:
 - notes: Optional comments
 """
 
+import gzip
+import hashlib
+import json
+import os
+import re
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from pathlib import Path
 
@@ -50,6 +56,19 @@ COLUMN_INFO = {
     'notes': 'Any relevant notes or flags',
 }
 
+# Columns the analytics read; the rest is free text (URLs, dates, notes)
+# that only the Data & Sources page shows, so readers can skip it
+ANALYTIC_COLUMNS = ['bank', 'period_type', 'period', 'gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
+TEXT_COLUMNS = [col for col in SCHEMA if col not in ANALYTIC_COLUMNS]
+
+# Optional exposure column (not in SCHEMA): when a table carries it, system
+# aggregates also report exposure-weighted means
+WEIGHT_COLUMN = 'total_assets'
+
+# Columns of the shared analytics/dashboard panel; BankPanel.data_hash keys
+# artifacts on these, so a weights-only change rebuilds weighted aggregates
+PANEL_COLUMNS = ANALYTIC_COLUMNS + [WEIGHT_COLUMN]
+
 # ===== VALIDATION RANGES =====
 VALIDATION_RANGES = {
     'gnpa_pct': (0, 15, 'GNPA should be 0-15%'),
@@ -58,20 +77,231 @@ VALIDATION_RANGES = {
     'casa_pct': (0, 100, 'CASA should be 0-100%'),
 }
 
+# ===== PERIOD ENCODING =====
+# 'YYYY-Qn' follows the collection convention in bank_list.QUARTERS: YYYY is
+# the year the Indian fiscal year starts (2025-Q3 = Oct-Dec 2025 = Q3 FY26).
+# 'FY2025' is the fiscal year ending March 2025.
+# period_key = fiscal_year * 10 + slot, slot 1-4 for quarters and 5 for the
+# full year, so FY rows sort right after their Q4 and integer max/sort give
+# chronological order. Unparseable periods get key -1.
+PERIOD_COLUMNS = {
+    'period_key': np.int32,         # Chronological ordinal (e.g. 20263)
+    'fiscal_year': np.int16,        # FY end year (2025-Q3 -> 2026)
+    'quarter': np.int8,             # 1-4, or 0 for full-year rows
+}
+
+_QUARTER_RE = re.compile(r'^(\d{4})-Q([1-4])$')
+_FY_QUARTER_RE = re.compile(r'^Q([1-4])[\s-]?FY(\d{2}|\d{4})$')
+_FY_RE = re.compile(r'^FY[\s-]?(\d{2}|\d{4})$')
+
+
+def _full_year(year):
+    year = int(year)
+    return year + 2000 if year < 100 else year
+
+
+def parse_period(period):
+    """
+    Parse one period label into (period_key, fiscal_year, quarter)
+    
+    Accepts '2025-Q3', 'Q3-FY26', 'FY2025' and 'FY25'.
+    Returns (-1, -1, -1) if the label is not recognised.
+    """
+    text = str(period).strip().upper()
+    
+    match = _QUARTER_RE.match(text)
+    if match:
+        fiscal_year = int(match.group(1)) + 1
+        quarter = int(match.group(2))
+        return fiscal_year * 10 + quarter, fiscal_year, quarter
+    
+    match = _FY_QUARTER_RE.match(text)
+    if match:
+        fiscal_year = _full_year(match.group(2))
+        quarter = int(match.group(1))
+        return fiscal_year * 10 + quarter, fiscal_year, quarter
+    
+    match = _FY_RE.match(text)
+    if match:
+        fiscal_year = _full_year(match.group(1))
+        return fiscal_year * 10 + 5, fiscal_year, 0
+    
+    return -1, -1, -1
+
+
+def encode_periods(periods):
+    """
+    Vectorized period encoding: each distinct label is parsed once
+    
+    Args:
+        periods (array-like): Period labels
+        
+    Returns:
+        pd.DataFrame: PERIOD_COLUMNS aligned with the input
+    """
+    periods = pd.Series(periods)
+    codes, uniques = pd.factorize(periods)
+    parsed = np.array([parse_period(p) for p in uniques], dtype=np.int64).reshape(-1, 3)
+    # Missing labels have code -1; point them at an extra "unparsed" row
+    parsed = np.vstack([parsed, [-1, -1, -1]])
+    encoded = parsed[codes]
+    
+    return pd.DataFrame({
+        col: encoded[:, i].astype(dtype)
+        for i, (col, dtype) in enumerate(PERIOD_COLUMNS.items())
+    }, index=periods.index)
+
 
-def create_empty_dataframe():
+def add_period_columns(df, overwrite=False):
+    """
+    Add period_key / fiscal_year / quarter columns to df in place
+    
+    Skipped when the columns already exist unless overwrite=True.
+    """
+    if 'period' not in df.columns:
+        return df
+    if overwrite or not all(col in df.columns for col in PERIOD_COLUMNS):
+        encoded = encode_periods(df['period'])
+        for col in PERIOD_COLUMNS:
+            df[col] = encoded[col].to_numpy()
+    return df
+
+
+def upsert_rows(df, delta, keys=('bank', 'period')):
+    """
+    Insert or replace rows of df keyed on (bank, period)
+    
+    Rows of df whose key appears in delta are dropped and the delta rows are
+    appended with fresh index labels. Surviving rows keep their labels and
+    order, so the result is identical to rebuilding the table in that order.
+    A df without an integer index (e.g. string labels) has no "next" label,
+    so the merged table is relabelled 0..n-1 instead (see has_integer_labels).
+    
+    Args:
+        df (pd.DataFrame): Existing table
+        delta (pd.DataFrame): New or corrected rows (last duplicate wins)
+        keys (tuple): Key columns
+        
+    Returns:
+        (pd.DataFrame, pd.DataFrame, np.ndarray): merged table, the delta
+        rows as stored (with their new labels), and a boolean mask over
+        df of the rows that were replaced
+    """
+    keys = list(keys)
+    delta = delta.drop_duplicates(subset=keys, keep='last')
+    if len(df) == 0:
+        replaced = np.zeros(0, dtype=bool)
+        kept, start = None, 0
+    else:
+        delta_keys = pd.MultiIndex.from_frame(delta[keys])
+        replaced = pd.MultiIndex.from_frame(df[keys]).isin(delta_keys)
+        kept = df[~replaced]
+        if has_integer_labels(df):
+            start = int(df.index.max()) + 1
+        else:
+            kept = kept.set_axis(pd.RangeIndex(len(kept)))
+            start = len(kept)
+    delta = delta.set_axis(pd.RangeIndex(start, start + len(delta)))
+    merged = delta if kept is None else pd.concat([kept, delta])
+    return merged, delta, replaced
+
+
+def has_integer_labels(df):
+    """True if upsert_rows keeps df's row labels (integer index)"""
+    return pd.api.types.is_integer_dtype(df.index.dtype)
+
+
+def sort_periods(periods, reverse=False):
+    """Sort period labels chronologically (not as strings)"""
+    return sorted(periods, key=lambda p: parse_period(p)[0], reverse=reverse)
+
+
+# ===== COMPACT IN-MEMORY DTYPES =====
+# Selected from SCHEMA: repeated text (bank codes, periods, URLs, notes)
+# becomes dictionary-encoded categoricals and the percentage metrics become
+# float32 (~7 significant digits, far more than the 2 decimals reported).
+COMPACT_DTYPES = {
+    col: 'category' if dtype is str else 'float32'
+    for col, dtype in SCHEMA.items()
+}
+
+
+def create_empty_dataframe(compact=False):
     """
     Create empty DataFrame with the correct schema
     
+    Args:
+        compact (bool): Use COMPACT_DTYPES (categoricals/float32)
+    
     Returns:
         pd.DataFrame: Empty dataframe with correct column types
     """
     df = pd.DataFrame(columns=list(SCHEMA.keys()))
     for col, dtype in SCHEMA.items():
         df[col] = df[col].astype(dtype)
+    if compact:
+        df = compact_dataframe(df)
     return df
 
 
+def compact_dataframe(df):
+    """
+    Convert SCHEMA columns to the memory-compact COMPACT_DTYPES plan
+    
+    Columns outside SCHEMA are left untouched.
+    
+    Args:
+        df (pd.DataFrame): Tidy table
+        
+    Returns:
+        pd.DataFrame: Compacted copy
+    """
+    plan = {col: dtype for col, dtype in COMPACT_DTYPES.items() if col in df.columns}
+    return df.astype(plan)
+
+
+def memory_report(before, after):
+    """
+    Compare deep memory usage of two versions of the same table
+    
+    Returns:
+        dict: before_bytes, after_bytes, saved_bytes, saved_pct and a
+              per_column DataFrame
+    """
+    before_cols = before.memory_usage(index=False, deep=True)
+    after_cols = after.memory_usage(index=False, deep=True)
+    per_column = pd.DataFrame({
+        'before_bytes': before_cols,
+        'after_bytes': after_cols.reindex(before_cols.index),
+        'before_dtype': before.dtypes.astype(str),
+        'after_dtype': after.dtypes.reindex(before_cols.index).astype(str),
+    })
+    before_bytes = int(before_cols.sum())
+    after_bytes = int(after_cols.sum())
+    return {
+        'before_bytes': before_bytes,
+        'after_bytes': after_bytes,
+        'saved_bytes': before_bytes - after_bytes,
+        'saved_pct': (1 - after_bytes / before_bytes) * 100 if before_bytes else 0.0,
+        'per_column': per_column,
+    }
+
+
+def print_memory_report(report):
+    """Print the output of memory_report()"""
+    print("\n" + "="*70)
+    print("MEMORY REPORT - COMPACT DTYPES")
+    print("="*70)
+    for col, row in report['per_column'].iterrows():
+        print(f"  {col:20} {row['before_dtype']:>10} → {row['after_dtype']:10} "
+              f"{row['before_bytes']:>12,} → {row['after_bytes']:>12,} bytes")
+    print("-" * 70)
+    print(f"  Before: {report['before_bytes']:,} bytes")
+    print(f"  After:  {report['after_bytes']:,} bytes")
+    print(f"  Saved:  {report['saved_bytes']:,} bytes ({report['saved_pct']:.1f}%)")
+    print("="*70 + "\n")
+
+
 def save_csv(df, filepath='bank_metrics.csv'):
     """
     Save dataframe to CSV file
@@ -103,6 +333,287 @@ def load_csv(filepath='bank_metrics.csv'):
     return df
 
 
+# ===== COLUMNAR STORAGE =====
+# Parquet / Arrow IPC (Feather) keep dtypes on disk, so pipeline steps skip
+# CSV parsing and type inference. CSV stays available for import/export.
+# pyarrow is only imported when a columnar file is read or written.
+TABLE_FORMATS = {
+    '.parquet': 'parquet',
+    '.feather': 'ipc',
+    '.arrow': 'ipc',
+    '.csv': 'csv',
+}
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.dataset
+    except ImportError as exc:
+        raise ImportError(
+            "pyarrow is required for Parquet/Feather storage: pip install pyarrow"
+        ) from exc
+    return pyarrow
+
+
+def _table_format(filepath):
+    suffix = Path(filepath).suffix.lower()
+    if suffix not in TABLE_FORMATS:
+        raise ValueError(f"Unsupported table format '{suffix}' (use one of {list(TABLE_FORMATS)})")
+    return TABLE_FORMATS[suffix]
+
+
+def arrow_schema(columns=None):
+    """Arrow schema for the SCHEMA columns (optionally a subset)"""
+    pa = _require_pyarrow()
+    arrow_types = {str: pa.string(), float: pa.float64()}
+    columns = list(SCHEMA) if columns is None else [c for c in SCHEMA if c in columns]
+    return pa.schema([(col, arrow_types[SCHEMA[col]]) for col in columns])
+
+
+def find_table(stem):
+    """
+    First existing file for a table stem, preferring columnar formats
+    
+    Example: find_table('bank_metrics_validated') ->
+             'bank_metrics_validated.parquet' if present, else the CSV
+    """
+    for suffix in TABLE_FORMATS:
+        path = Path(f"{stem}{suffix}")
+        if path.exists():
+            return str(path)
+    raise FileNotFoundError(f"No table found for '{stem}' ({', '.join(TABLE_FORMATS)})")
+
+
+def save_table(df, filepath='bank_metrics.parquet', row_group_size=100_000, verbose=True):
+    """
+    Save the tidy table as Parquet, Feather/Arrow IPC or CSV (by extension)
+    
+    SCHEMA columns are written with enforced types. Rows are sorted by
+    bank and period so Parquet row-group statistics can prune bank/period
+    filters on read.
+    
+    Args:
+        df (pd.DataFrame): Data to save
+        filepath (str): Output path (.parquet, .feather, .arrow or .csv)
+        row_group_size (int): Parquet row group size
+        verbose (bool): Print a save summary
+    """
+    fmt = _table_format(filepath)
+    if fmt == 'csv':
+        if verbose:
+            save_csv(df, filepath)
+        else:
+            df.to_csv(filepath, index=False)
+        return
+    
+    pa = _require_pyarrow()
+    sort_cols = [c for c in ('bank', 'period_key', 'period') if c in df.columns]
+    ordered = df.sort_values(sort_cols, kind='stable') if sort_cols else df
+    
+    table = pa.Table.from_pandas(ordered, preserve_index=False)
+    schema = arrow_schema(table.column_names)
+    for field in schema:
+        i = table.schema.get_field_index(field.name)
+        table = table.set_column(i, field, table.column(i).cast(field.type))
+    
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        pq.write_table(table, filepath, row_group_size=row_group_size)
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, filepath)
+    
+    if not verbose:
+        return
+    print(f"✅ Saved to {filepath}")
+    print(f"   Rows: {len(df)}")
+    print(f"   Columns: {len(df.columns)}")
+
+
+def load_table(filepath='bank_metrics.parquet', columns=None, banks=None, periods=None,
+               compact=False):
+    """
+    Load the tidy table with column projection and bank/period filters
+    
+    For Parquet/Feather only the requested columns are read and the
+    bank/period filters are pushed down to the reader; CSV falls back to
+    usecols plus an in-memory filter.
+    
+    Args:
+        filepath (str): Path to .parquet, .feather, .arrow or .csv file
+        columns (list): Columns to load (default: all)
+        banks (list): Only rows for these bank codes
+        periods (list): Only rows for these periods
+        compact (bool): Return COMPACT_DTYPES (see compact_dataframe)
+        
+    Returns:
+        pd.DataFrame: Loaded data
+    """
+    fmt = _table_format(filepath)
+    
+    if fmt == 'csv':
+        read_cols = None
+        if columns is not None:
+            read_cols = list(dict.fromkeys(list(columns) +
+                                           (['bank'] if banks is not None else []) +
+                                           (['period'] if periods is not None else [])))
+        dtypes = {col: dtype for col, dtype in SCHEMA.items()
+                  if read_cols is None or col in read_cols}
+        df = pd.read_csv(filepath, usecols=read_cols, dtype=dtypes)
+        mask = np.ones(len(df), dtype=bool)
+        if banks is not None:
+            mask &= df['bank'].isin(banks).to_numpy()
+        if periods is not None:
+            mask &= df['period'].isin(periods).to_numpy()
+        df = df[mask].reset_index(drop=True)
+        if columns is not None:
+            df = df[list(columns)]
+        return compact_dataframe(df) if compact else df
+    
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+    
+    dataset = ds.dataset(filepath, format=fmt)
+    predicate = None
+    if banks is not None:
+        predicate = ds.field('bank').isin(list(banks))
+    if periods is not None:
+        period_filter = ds.field('period').isin(list(periods))
+        predicate = period_filter if predicate is None else predicate & period_filter
+    
+    table = dataset.to_table(columns=list(columns) if columns is not None else None,
+                             filter=predicate)
+    df = table.to_pandas()
+    return compact_dataframe(df) if compact else df
+
+
+def table_columns(filepath):
+    """Column names of a stored table, without reading its rows"""
+    fmt = _table_format(filepath)
+    if fmt == 'csv':
+        return list(pd.read_csv(filepath, nrows=0).columns)
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+    return ds.dataset(filepath, format=fmt).schema.names
+
+
+# ===== MEMORY-MAPPED SHARED TABLE =====
+# An uncompressed Arrow IPC file can be memory-mapped read-only: every
+# dashboard session and worker process maps the same pages from the OS page
+# cache instead of holding its own pickled copy.
+
+def table_signature(filepath):
+    """(resolved path, mtime_ns, size) - changes whenever the file is rewritten"""
+    stat = os.stat(filepath)
+    return str(Path(filepath).resolve()), stat.st_mtime_ns, stat.st_size
+
+
+def materialize_mmap(df, filepath):
+    """
+    Write df as an uncompressed Arrow IPC file for memory mapping
+    
+    Period columns are added and text columns dictionary-encoded before
+    writing so readers need no further conversion. The file is written
+    to a temporary name and renamed, so readers never see a partial file.
+    """
+    pa = _require_pyarrow()
+    import pyarrow.ipc as ipc
+    
+    df = compact_dataframe(add_period_columns(df.copy()))
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    
+    tmp_path = f"{filepath}.tmp-{os.getpid()}"
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, filepath)
+    return filepath
+
+
+def _source_stat(filepath):
+    # ctime moves on every write or rename, even when a copy keeps mtime
+    stat = os.stat(filepath)
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns, stat.st_ino]
+
+
+def _file_digest(filepath):
+    sha = hashlib.sha256()
+    with open(filepath, 'rb') as source:
+        for block in iter(lambda: source.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def ensure_mmap(source_path, mmap_path):
+    """
+    Materialise mmap_path from source_path unless it holds the same content
+    
+    The source's stat and SHA-256 are recorded in <mmap_path>.source.json.
+    An unchanged stat is trusted, so a call costs one stat. Any change
+    (including a replacement that kept its timestamps) re-hashes the
+    source, and the file is rebuilt only if the content differs.
+    """
+    record_path = Path(f"{mmap_path}.source.json")
+    record = json.loads(record_path.read_text()) if record_path.exists() else {}
+    stat = _source_stat(source_path)
+    if Path(mmap_path).exists() and record.get('stat') == stat:
+        return mmap_path
+    
+    digest = _file_digest(source_path)
+    if not Path(mmap_path).exists() or record.get('sha256') != digest:
+        materialize_mmap(load_table(source_path), mmap_path)
+    record_path.write_text(json.dumps({'stat': stat, 'sha256': digest}))
+    return mmap_path
+
+
+def open_mmap(filepath, columns=None):
+    """
+    Open a materialize_mmap() file as a DataFrame backed by the mapping
+    
+    Numeric columns without nulls are zero-copy views of the mapped file.
+    With columns, the other columns are never converted (columns missing
+    from the file are ignored).
+    """
+    pa = _require_pyarrow()
+    import pyarrow.ipc as ipc
+    
+    source = pa.memory_map(str(filepath), 'r')
+    table = ipc.open_file(source).read_all()
+    if columns is not None:
+        table = table.select([col for col in columns if col in table.column_names])
+    return table.to_pandas(split_blocks=True)
+
+
+# ===== DOWNLOAD EXPORTS =====
+EXPORT_CHUNK_ROWS = 50_000
+
+
+def export_table(df, filepath, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Write df as a download file
+    
+    CSV (gzip-compressed if the name ends in .gz) is streamed chunk by
+    chunk, so the whole file never exists as one string; other extensions
+    go through save_table. The file is written under a temporary name and
+    renamed, so readers never see a partial file.
+    
+    Returns:
+        Path: filepath
+    """
+    path = Path(filepath)
+    tmp_path = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+    if path.name.endswith(('.csv', '.csv.gz')):
+        opener = gzip.open if path.suffix == '.gz' else open
+        with opener(tmp_path, 'wt', newline='') as sink:
+            for start in range(0, max(len(df), 1), chunk_rows):
+                df.iloc[start:start + chunk_rows].to_csv(sink, index=False, header=start == 0)
+    else:
+        save_table(df, tmp_path, verbose=False)
+    os.replace(tmp_path, path)
+    return path
+
+
 def print_schema():
     """Print data model schema"""
     print("\n" + "="*70)
@@ -216,6 +727,7 @@ if __name__ == "__main__":
     # Create sample data
     print("Creating sample data (5 rows for reference)...")
     df_sample = create_sample_data()
+    print_memory_report(memory_report(df_sample, compact_dataframe(df_sample)))
     save_csv(df_sample, 'bank_metrics_sample.csv')
     print(f"✅ Sample data created (5 rows)\n")
     print(df_sample.to_string())
@@ -0,0 +1,381 @@
+"""
+STEP 3b: PDF EXTRACTION - Batch metrics from downloaded filings
+================================================================
+Project: NPA Analysis Dashboard
+
+Automates Step 2 of the INGESTION_GUIDE for a directory of downloaded
+filing PDFs. Each PDF is read page by page and the four metrics are
+matched by label ("Gross NPA", "Net NPA", "NIM", "CASA"). Files are
+processed in a process pool and the results are written as
+collection_checklist.csv rows, which load_partially_filled_data and
+merge_filled_data consume unchanged.
+
+Bank and quarter come from the file name, following the naming used in
+source_url (e.g. SBI_quarterly_2025-Q3.pdf or SBI_Q3FY26.pdf; NSE tickers
+such as SBIN also work), else from the first quarter label found in the
+text. Files whose bank or quarter cannot be identified are reported and
+left out of the checklist.
+
+Rows with all four metrics are marked DONE; partial rows stay TODO for
+manual completion. Provenance (page and matched text per metric) is kept
+in the extracted_from column.
+
+With an ExtractionCache, each document's extraction is stored under its
+content hash, so re-runs over a large folder only parse new or changed
+PDFs.
+
+Requires pypdf (optional dependency): pip install pypdf
+
+Run with:
+    python extract.py downloads/ --output collection_checklist.csv --workers 4
+    python extract.py downloads/ --cache-dir .extract_cache --cache-mb 256
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import re
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from .bank_list import get_all_banks
+    from .data_model import parse_period
+except ImportError:  # run as a script from src/
+    from bank_list import get_all_banks
+    from data_model import parse_period
+
+# Bump when patterns or parsing change: cached extractions are then redone
+EXTRACTOR_VERSION = 1
+
+# Checklist layout (see bank_list.create_collection_checklist) plus provenance
+CHECKLIST_COLUMNS = [
+    'bank_code', 'bank_name', 'nse_ticker', 'quarter', 'status',
+    'gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct', 'source_url', 'source_date',
+]
+PROVENANCE_COLUMNS = ['source_file', 'extracted_from']
+
+# Label, then up to 40 non-digit characters (": ", "(%)", "Ratio"), then a
+# decimal value. The value must carry a % sign or the label must mention %,
+# so amounts in crore (84,276.50) are not mistaken for ratios.
+_VALUE = r'(?P<between>[^\d\n]{0,40}?)(?P<value>\d{1,2}\.\d{1,2})(?![\d,])(?P<pct>\s*%)?'
+METRIC_PATTERNS = {
+    'gnpa_pct': re.compile(r'\bG(?:ross)?\.?\s*NPAs?\b' + _VALUE, re.IGNORECASE),
+    'nnpa_pct': re.compile(r'\bN(?:et)?\.?\s*NPAs?\b' + _VALUE, re.IGNORECASE),
+    'nim_pct': re.compile(r'(?:\bNet\s+Interest\s+Margin\b|\bNIM\b)' + _VALUE, re.IGNORECASE),
+    'casa_pct': re.compile(r'\bCASA\b' + _VALUE, re.IGNORECASE),
+}
+
+_FILENAME_RE = re.compile(r'^(?P<bank>[A-Za-z0-9]+?)[_\-\s].*?'
+                          r'(?P<period>\d{4}-Q[1-4]|Q[1-4][\s_-]?FY(?:\d{4}|\d{2})(?!\d))', re.IGNORECASE)
+_TEXT_PERIOD_RE = re.compile(r'\b(\d{4}-Q[1-4]|Q[1-4][\s-]?FY\d{2,4})\b', re.IGNORECASE)
+
+
+def _require_pypdf():
+    try:
+        import pypdf
+    except ImportError as exc:
+        raise ImportError(
+            "pypdf is required for PDF extraction: pip install pypdf"
+        ) from exc
+    return pypdf
+
+
+def _bank_lookup():
+    """{bank code or NSE ticker (upper case): (code, info)}"""
+    lookup = {}
+    for code, info in get_all_banks(include_optional=True).items():
+        lookup[info['nse_ticker'].upper()] = (code, info)
+        lookup[code.upper()] = (code, info)
+    return lookup
+
+
+def _quarter_label(text):
+    """'YYYY-Qn' collection label for a quarter label like 'Q3 FY26'"""
+    period_key, fiscal_year, quarter = parse_period(text)
+    if period_key < 0 or quarter == 0:
+        return None
+    return f"{fiscal_year - 1}-Q{quarter}"
+
+
+def find_metrics(pages):
+    """
+    First match of every metric across page texts
+
+    Args:
+        pages (list): Text of each page
+
+    Returns:
+        dict: metric -> (value, page number (1-based), matched text)
+    """
+    found = {}
+    for page_no, text in enumerate(pages, start=1):
+        for metric, pattern in METRIC_PATTERNS.items():
+            if metric in found:
+                continue
+            for match in pattern.finditer(text):
+                if match.group('pct') or '%' in match.group('between'):
+                    found[metric] = (float(match.group('value')), page_no,
+                                     ' '.join(match.group(0).split()))
+                    break
+        if len(found) == len(METRIC_PATTERNS):
+            break
+    return found
+
+
+def read_document(data):
+    """
+    Everything extracted from the PDF bytes alone (cacheable by content)
+
+    Returns:
+        dict: metrics (metric -> value), extracted_from, source_date and
+              text_quarter (first quarter label in the text); or error
+    """
+    pypdf = _require_pypdf()
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(data))
+        pages = [page.extract_text() or '' for page in reader.pages]
+        created = reader.metadata.creation_date if reader.metadata else None
+    except Exception as exc:
+        return {'error': f"error: {type(exc).__name__}: {exc}"}
+
+    text_quarter = None
+    for text in pages:
+        label = _TEXT_PERIOD_RE.search(text)
+        if label:
+            text_quarter = _quarter_label(label.group(1))
+            break
+
+    found = find_metrics(pages)
+    return {
+        'metrics': {metric: value for metric, (value, _, _) in found.items()},
+        'extracted_from': '; '.join(f"{metric} p.{page_no} '{text}'"
+                                    for metric, (_, page_no, text) in found.items()),
+        'source_date': created.strftime('%Y-%m-%d') if created is not None else '',
+        'text_quarter': text_quarter,
+    }
+
+
+def checklist_row(path, document):
+    """Combine read_document() output with the bank/quarter from the file name"""
+    path = Path(path)
+    row = {col: '' for col in CHECKLIST_COLUMNS + PROVENANCE_COLUMNS}
+    row.update({'status': 'TODO', 'source_file': path.name, 'source_url': path.resolve().as_uri()})
+    if 'error' in document:
+        row['extracted_from'] = document['error']
+        return row
+
+    # Bank and quarter: file name first, then the text
+    match = _FILENAME_RE.match(path.stem)
+    bank = _bank_lookup().get(match.group('bank').upper()) if match else None
+    if bank is not None:
+        row['bank_code'], row['bank_name'], row['nse_ticker'] = bank[0], bank[1]['full_name'], bank[1]['nse_ticker']
+    elif match:
+        row['bank_code'] = match.group('bank').upper()
+    name_quarter = _quarter_label(match.group('period').replace('_', '-')) if match else None
+    row['quarter'] = name_quarter or document['text_quarter'] or ''
+
+    row.update(document['metrics'])
+    row['extracted_from'] = document['extracted_from']
+    row['source_date'] = document['source_date']
+    if len(document['metrics']) == len(METRIC_PATTERNS) and row['bank_code'] and row['quarter']:
+        row['status'] = 'DONE'
+    return row
+
+
+def _extract(path, cache=None):
+    """(checklist row, cache hit) for one file"""
+    data = Path(path).read_bytes()
+    if cache is None:
+        return checklist_row(path, read_document(data)), False
+    digest = hashlib.sha256(data).hexdigest()
+    document = cache.get(digest)
+    hit = document is not None
+    if not hit:
+        document = read_document(data)
+        cache.put(digest, document)
+    return checklist_row(path, document), hit
+
+
+def extract_pdf(pdf_path, cache=None):
+    """
+    Extract one filing into a checklist row
+
+    Never raises on bad files: unreadable PDFs come back as a TODO row with
+    the error in extracted_from, so one bad PDF does not stop a batch.
+
+    Args:
+        pdf_path (str): Path to the PDF
+        cache (ExtractionCache): Reuse results for unchanged content
+
+    Returns:
+        dict: CHECKLIST_COLUMNS + PROVENANCE_COLUMNS
+    """
+    return _extract(pdf_path, cache)[0]
+
+
+class ExtractionCache:
+    """
+    read_document() results on disk, keyed by PDF content hash
+
+    One JSON file per document under root, named v<EXTRACTOR_VERSION>-
+    <sha256>, so renamed or moved files still hit and an extractor change
+    misses. Entries are written atomically (safe from pool workers). A hit
+    refreshes the entry's mtime; evict() removes entries from other
+    extractor versions, then least recently used ones, until the cache
+    fits in max_bytes.
+    """
+
+    def __init__(self, root='.extract_cache', max_bytes=256 * 2**20):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.stats = {'hits': 0, 'misses': 0, 'evicted': 0}
+
+    def key(self, digest):
+        return f"v{EXTRACTOR_VERSION}-{digest}"
+
+    def path(self, digest):
+        return self.root / f"{self.key(digest)}.json"
+
+    def get(self, digest):
+        path = self.path(digest)
+        try:
+            document = json.loads(path.read_text())
+            os.utime(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        return document
+
+    def put(self, digest, document):
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.path(digest)
+        tmp_path = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+        tmp_path.write_text(json.dumps(document))
+        os.replace(tmp_path, path)
+
+    def size(self):
+        """Total bytes of cached entries"""
+        return sum(entry.stat().st_size for entry in self.root.glob('v*.json'))
+
+    def evict(self):
+        """Trim the cache to max_bytes; returns the number of entries removed"""
+        entries = []
+        for entry in self.root.glob('v*.json'):
+            stat = entry.stat()
+            stale = not entry.name.startswith(f"v{EXTRACTOR_VERSION}-")
+            entries.append((not stale, stat.st_mtime_ns, stat.st_size, entry))
+        entries.sort(key=lambda item: item[:2])   # stale first, then oldest
+
+        total = sum(size for _, _, size, _ in entries)
+        removed = 0
+        for current, _, size, entry in entries:
+            if current and total <= self.max_bytes:
+                break
+            entry.unlink(missing_ok=True)
+            total -= size
+            removed += 1
+        self.stats['evicted'] += removed
+        return removed
+
+    def report(self):
+        """One-line hit/miss summary for the last run"""
+        looked_up = self.stats['hits'] + self.stats['misses']
+        rate = self.stats['hits'] / looked_up * 100 if looked_up else 0.0
+        return (f"cache: {self.stats['hits']} hits, {self.stats['misses']} misses "
+                f"({rate:.1f}% hit rate), {self.stats['evicted']} evicted, "
+                f"{self.size() / 2**20:.1f} MB in {self.root}")
+
+
+def extract_directory(pdf_dir, workers=None, cache=None):
+    """
+    Extract every PDF in a directory (recursively) in a process pool
+
+    Args:
+        pdf_dir (str): Directory of downloaded filings
+        workers (int): Worker processes (default: one per core;
+                       1 = run in this process)
+        cache (ExtractionCache): Skip unchanged documents; its stats are
+                                 reset and filled for this run, then it
+                                 is trimmed to its size bound
+
+    Returns:
+        pd.DataFrame: One checklist row per PDF, in file name order
+    """
+    paths = sorted(Path(pdf_dir).rglob('*.pdf'), key=lambda p: str(p).lower())
+    if workers == 1:
+        results = [_extract(path, cache) for path in paths]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_extract, paths, [cache] * len(paths), chunksize=4))
+
+    if cache is not None:
+        hits = sum(hit for _, hit in results)
+        cache.stats = {'hits': hits, 'misses': len(results) - hits, 'evicted': 0}
+        cache.evict()
+    return pd.DataFrame([row for row, _ in results], columns=CHECKLIST_COLUMNS + PROVENANCE_COLUMNS)
+
+
+def update_checklist(extracted, checklist_path='collection_checklist.csv'):
+    """
+    Write extracted rows into the collection checklist
+
+    Rows already DONE in the checklist (e.g. entered by hand) are kept;
+    other (bank_code, quarter) rows are replaced by the extraction, and
+    new ones are appended. Files without a bank or quarter are skipped,
+    with one line each. Creates the checklist if it does not exist.
+
+    Returns:
+        pd.DataFrame: Updated checklist
+    """
+    identified = (extracted['bank_code'] != '') & (extracted['quarter'] != '')
+    for name in extracted.loc[~identified, 'source_file']:
+        print(f"⚠️  Skipped {name}: bank or quarter not found in the file name or text")
+    extracted = extracted[identified]
+    extracted = extracted.drop_duplicates(['bank_code', 'quarter'], keep='last')
+
+    path = Path(checklist_path)
+    if path.exists():
+        checklist = pd.read_csv(path, dtype={'source_url': str, 'source_date': str})
+        for col in PROVENANCE_COLUMNS:
+            if col not in checklist.columns:
+                checklist[col] = ''
+        keys = pd.MultiIndex.from_frame(checklist[['bank_code', 'quarter']])
+        new_keys = pd.MultiIndex.from_frame(extracted[['bank_code', 'quarter']])
+        done = keys[checklist['status'].to_numpy() == 'DONE']
+        extracted = extracted[~new_keys.isin(done)]
+        replaced = keys.isin(pd.MultiIndex.from_frame(extracted[['bank_code', 'quarter']]))
+        checklist = pd.concat([checklist[~replaced], extracted], ignore_index=True)
+    else:
+        checklist = extracted.reset_index(drop=True)
+
+    checklist.to_csv(path, index=False)
+    return checklist
+
+
+# ===== MAIN EXECUTION =====
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract bank metrics from filing PDFs")
+    parser.add_argument('pdf_dir', help="Directory of downloaded filing PDFs")
+    parser.add_argument('--output', default='collection_checklist.csv', help="Checklist CSV to update")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--cache-dir', default='.extract_cache', help="Extraction cache directory")
+    parser.add_argument('--cache-mb', type=float, default=256, help="Cache size bound in MB")
+    parser.add_argument('--no-cache', action='store_true', help="Re-extract every document")
+    args = parser.parse_args()
+
+    print("\n📄 STEP 3b: PDF EXTRACTION\n")
+    cache = None if args.no_cache else ExtractionCache(args.cache_dir, int(args.cache_mb * 2**20))
+    extracted = extract_directory(args.pdf_dir, workers=args.workers, cache=cache)
+    done = (extracted['status'] == 'DONE').sum()
+    failed = extracted['extracted_from'].str.startswith('error:').sum()
+    print(f"✅ Processed {len(extracted)} PDFs: {done} complete, "
+          f"{len(extracted) - done - failed} partial, {failed} unreadable")
+    if cache is not None:
+        print(f"   {cache.report()}")
+
+    checklist = update_checklist(extracted, args.output)
+    print(f"✅ {args.output} updated ({len(checklist)} rows)")
+    print("   Review TODO rows, then run load_partially_filled_data / merge_filled_data\n")
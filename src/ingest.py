@@ -8,6 +8,7 @@ Date: January 18, 2026
 WORKFLOW:
 1. Download investor presentations (PDF) from NSE
 2. Extract metrics from "Asset Quality" slides
+   (or in batch with extract.py, see STEP 3b)
 3. Enter into Excel/CSV template
 4. Validate and save
 
@@ -17,7 +18,9 @@ DATA SOURCES:
 - Bank IR websites: https://www.[bankname].com/investor
 """
 
+import os
 import pandas as pd
+import numpy as np
 from datetime import datetime
 from pathlib import Path
 
@@ -250,13 +253,16 @@ def validate_filled_data(df):
     return df
 
 
-def merge_filled_data(df_collected, output_file='bank_metrics.csv'):
-    """
-    Merge manually collected data into final CSV
-    
-    Input: collection_checklist.csv (partially or fully filled)
-    Output: bank_metrics.csv (ready for analytics)
-    """
+# Tidy table column order written by the merges
+FINAL_COLUMNS = [
+    'bank', 'period_type', 'period',
+    'gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct',
+    'source_url', 'source_doc_date', 'notes'
+]
+
+
+def _checklist_to_tidy(df_collected):
+    """DONE checklist rows renamed and completed into FINAL_COLUMNS"""
     
     # Filter only completed rows
     df_final = df_collected[df_collected['status'] == 'DONE'].copy()
@@ -280,18 +286,29 @@ def merge_filled_data(df_collected, output_file='bank_metrics.csv'):
     df_final['notes'] = 'Manually collected from NSE filings'
     
     # Select final columns in order
-    final_columns = [
-        'bank', 'period_type', 'period',
-        'gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct',
-        'source_url', 'source_doc_date', 'notes'
-    ]
+    return df_final[FINAL_COLUMNS]
+
+
+def merge_filled_data(df_collected, output_file='bank_metrics.csv', store=None):
+    """
+    Merge manually collected data into final CSV
+    
+    Input: collection_checklist.csv (partially or fully filled)
+    Output: bank_metrics.csv (ready for analytics)
     
-    df_final = df_final[final_columns]
+    With a store (store.TidyStore) the rows are also upserted into it,
+    rewriting only the partitions they fall in.
+    """
+    df_final = _checklist_to_tidy(df_collected)
     
     # Save
     df_final.to_csv(output_file, index=False)
     
     print(f"✅ Final dataset saved: {output_file}")
+    if store is not None:
+        written = store.upsert(df_final)
+        print(f"   Store: {written['inserted']} inserted, {written['updated']} updated "
+              f"({written['partitions_written']} partition(s) rewritten)")
     print(f"   Rows: {len(df_final)}")
     print(f"   Columns: {len(df_final.columns)}")
     print(f"   Expected: 144 rows (12 banks × 12 quarters)\n")
@@ -299,6 +316,131 @@ def merge_filled_data(df_collected, output_file='bank_metrics.csv'):
     return df_final
 
 
+# ===== STREAMING MERGE OF MANY CHECKLISTS =====
+MERGE_CHUNK_ROWS = 50_000
+DEDUP_RULES = ['last', 'source_date']
+
+
+def _read_checklist_chunks(paths, chunksize):
+    """(file number, first row number, chunk) for every chunk of every checklist"""
+    for file_no, path in enumerate(paths):
+        start = 0
+        for chunk in pd.read_csv(path, chunksize=chunksize,
+                                 dtype={'source_url': str, 'source_date': str}):
+            yield file_no, start, chunk
+            start += len(chunk)
+
+
+def merge_checklists(paths, output_file='bank_metrics.csv', dedup='last',
+                     chunksize=MERGE_CHUNK_ROWS, store=None):
+    """
+    Merge one or many checklists into the tidy table in constant memory
+    
+    Two streaming passes over the inputs, chunk by chunk. Pass 1 keeps
+    only the winning (file, row) for every (bank, period) among DONE rows
+    (memory grows with distinct bank-periods, not with input rows).
+    Pass 2 re-reads the chunks, transforms the winning rows exactly like
+    merge_filled_data and appends them to output_file.
+    
+    Args:
+        paths (list): Checklist CSVs, in priority order
+        output_file (str): Tidy CSV to write (replaced atomically)
+        dedup (str): 'last' = the later file/row wins; 'source_date' =
+                     the newest source_date wins (ties and missing
+                     dates fall back to 'last')
+        chunksize (int): Rows read per chunk
+        store (TidyStore): Also upsert each transformed chunk into this
+                           store (see store.py)
+    
+    Returns:
+        dict: rows_read, done_rows, duplicates_dropped, rows_written
+    """
+    if dedup not in DEDUP_RULES:
+        raise ValueError(f"dedup must be one of {DEDUP_RULES}")
+    paths = [paths] if isinstance(paths, (str, Path)) else list(paths)
+    order = (['source_date'] if dedup == 'source_date' else []) + ['file_no', 'row_no']
+    
+    # Pass 1: winner per (bank, period)
+    winners = None
+    rows_read = done_rows = 0
+    for file_no, start, chunk in _read_checklist_chunks(paths, chunksize):
+        done = np.flatnonzero(chunk['status'].to_numpy() == 'DONE')
+        candidates = pd.DataFrame({
+            'bank': chunk['bank_code'].to_numpy()[done],
+            'period': chunk['quarter'].to_numpy()[done],
+            'file_no': file_no,
+            'row_no': start + done,
+        })
+        if dedup == 'source_date':
+            candidates['source_date'] = pd.to_datetime(
+                chunk['source_date'].iloc[done], errors='coerce').to_numpy()
+        rows_read += len(chunk)
+        done_rows += len(done)
+        
+        winners = candidates if winners is None else pd.concat([winners, candidates], ignore_index=True)
+        winners = (winners.sort_values(order, na_position='first', kind='stable')
+                          .drop_duplicates(['bank', 'period'], keep='last'))
+    
+    keep = {} if winners is None else {
+        file_no: np.sort(group['row_no'].to_numpy())
+        for file_no, group in winners.groupby('file_no')
+    }
+    
+    # Pass 2: transform and append the winning rows
+    output = Path(output_file)
+    tmp_path = output.with_name(f".tmp-{os.getpid()}-{output.name}")
+    rows_written = 0
+    with open(tmp_path, 'w', newline='') as sink:
+        pd.DataFrame(columns=FINAL_COLUMNS).to_csv(sink, index=False)
+        for file_no, start, chunk in _read_checklist_chunks(paths, chunksize):
+            rows = np.arange(start, start + len(chunk))
+            selected = chunk[np.isin(rows, keep.get(file_no, []))]
+            if len(selected):
+                tidy = _checklist_to_tidy(selected)
+                tidy.to_csv(sink, index=False, header=False)
+                if store is not None:
+                    store.upsert(tidy)
+                rows_written += len(tidy)
+    os.replace(tmp_path, output)
+    
+    stats = {
+        'rows_read': rows_read,
+        'done_rows': done_rows,
+        'duplicates_dropped': done_rows - rows_written,
+        'rows_written': rows_written,
+    }
+    print(f"✅ Merged {len(paths)} checklist(s) into {output_file}")
+    print(f"   Rows read: {rows_read} | DONE: {done_rows} | "
+          f"Duplicates dropped ({dedup}): {stats['duplicates_dropped']} | Written: {rows_written}\n")
+    return stats
+
+
+def combine_checklists(frames, dedup='last'):
+    """
+    In-memory counterpart of merge_checklists for loaded checklists
+    
+    Picks the same winner per (bank, period) as merge_checklists with the
+    same dedup rule and returns the rows in the same order, without
+    writing anything.
+    
+    Args:
+        frames (list): Checklist DataFrames, in priority order
+        dedup (str): 'last' or 'source_date' (see merge_checklists)
+    
+    Returns:
+        pd.DataFrame: Tidy rows (FINAL_COLUMNS)
+    """
+    if dedup not in DEDUP_RULES:
+        raise ValueError(f"dedup must be one of {DEDUP_RULES}")
+    combined = pd.concat(frames, ignore_index=True)
+    done = combined[combined['status'] == 'DONE']
+    if dedup == 'source_date':
+        dates = pd.to_datetime(done['source_date'], errors='coerce')
+        done = done.loc[dates.sort_values(na_position='first', kind='stable').index]
+    winners = done.drop_duplicates(['bank_code', 'quarter'], keep='last').sort_index()
+    return _checklist_to_tidy(winners).reset_index(drop=True)
+
+
 # ===== MAIN EXECUTION =====
 if __name__ == "__main__":
     print("\n📥 STEP 3: DATA INGESTION - MANUAL APPROACH\n")
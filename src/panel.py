@@ -0,0 +1,368 @@
+"""
+SHARED PANEL - One copy of the bank × period table for all analytics
+=====================================================================
+Project: NPA Analysis Dashboard
+
+The analytics engines and the dashboard all need the same derived
+lookups (latest row per bank, rows per period, rows per bank). BankPanel holds a single
+copy of the tidy table and computes those lookups once, lazily. They are
+dropped only when the data is replaced or invalidate() is called.
+
+Periods are ordered by the integer period_key column (see
+data_model.encode_periods), never by the period string.
+
+PanelTensor is the same panel held as a dense (banks, periods, metrics)
+array, for analytics that are simpler as axis reductions.
+"""
+
+import hashlib
+import pandas as pd
+import numpy as np
+
+try:
+    from .data_model import SCHEMA, PANEL_COLUMNS, add_period_columns, encode_periods, \
+        has_integer_labels, upsert_rows
+    from .bank_list import QUARTERS, get_all_banks
+except ImportError:  # run as a script from src/
+    from data_model import SCHEMA, PANEL_COLUMNS, add_period_columns, encode_periods, \
+        has_integer_labels, upsert_rows
+    from bank_list import QUARTERS, get_all_banks
+
+
+class BankPanel:
+    """Tidy bank metrics table with cached per-bank / per-period indexes"""
+
+    def __init__(self, df, copy=True):
+        self._df = add_period_columns(df.copy() if copy else df)
+        self.version = 0
+        self._latest_index = None
+        self._period_positions = None
+        self._bank_positions = None
+        self._hashes = {}
+
+    @classmethod
+    def wrap(cls, data):
+        """Return data unchanged if it is already a BankPanel, else wrap it"""
+        if isinstance(data, cls):
+            return data
+        return cls(data)
+
+    @property
+    def df(self):
+        """Underlying tidy DataFrame (treat as read-only)"""
+        return self._df
+
+    def replace(self, df, copy=True):
+        """Swap in new data and drop all cached indexes"""
+        self._df = add_period_columns(df.copy() if copy else df)
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop cached indexes (call after mutating df in place)"""
+        self.version += 1
+        self._latest_index = None
+        self._period_positions = None
+        self._bank_positions = None
+        self._hashes = {}
+
+    def upsert(self, delta):
+        """
+        Insert or replace (bank, period) rows without a full recompute
+        
+        The latest-row index is patched for the touched banks only: a
+        bank's new latest row is either its previous latest row (if it
+        survived) or one of its delta rows. Other caches are dropped.
+        
+        Returns:
+            np.ndarray: Bank codes touched by the delta
+        """
+        delta = add_period_columns(delta.copy(), overwrite=True)
+        # Without integer labels upsert_rows relabels every row: no patching
+        old_latest = self._latest_index if has_integer_labels(self._df) else None
+        self._df, delta, replaced = upsert_rows(self._df, delta)
+        banks = pd.unique(delta['bank'])
+        
+        self.invalidate()
+        if old_latest is not None:
+            self._latest_index = self._patch_latest(old_latest, delta, banks)
+        return banks
+    
+    def _patch_latest(self, old_latest, delta, banks):
+        # Replaced labels are gone from df (NaN bank); they belonged to touched banks
+        old_banks = self._df['bank'].reindex(old_latest)
+        present = old_banks.notna().to_numpy()
+        touched = old_banks.isin(banks).to_numpy()
+        
+        survivors = old_latest[touched & present]
+        candidates = self._df.loc[survivors.append(delta.index), ['bank', 'period_key']]
+        patched = candidates.groupby('bank', observed=True)['period_key'].idxmax().to_numpy()
+        
+        labels = old_latest[~touched & present].append(pd.Index(patched))
+        order = np.argsort(self._df.loc[labels, 'bank'].to_numpy(), kind='stable')
+        return labels[order]
+
+    @property
+    def latest_index(self):
+        """Index labels of the latest row for each bank (one groupby)"""
+        if self._latest_index is None:
+            if len(self._df) == 0:
+                self._latest_index = self._df.index[:0]
+            else:
+                self._latest_index = pd.Index(self._df.groupby('bank', observed=True)['period_key'].idxmax().to_numpy())
+        return self._latest_index
+
+    @property
+    def period_positions(self):
+        """{period: integer row positions} for every period in the table"""
+        if self._period_positions is None:
+            self._period_positions = self._df.groupby('period', observed=True).indices
+        return self._period_positions
+
+    @property
+    def bank_positions(self):
+        """{bank: integer row positions in chronological order} (one sort)"""
+        if self._bank_positions is None:
+            codes, banks = pd.factorize(self._df['bank'])
+            keep = np.flatnonzero(codes >= 0)
+            order = keep[np.lexsort((self._df['period_key'].to_numpy()[keep], codes[keep]))]
+            bounds = np.cumsum(np.bincount(codes[keep], minlength=len(banks)))[:-1]
+            self._bank_positions = dict(zip(banks, np.split(order, bounds)))
+        return self._bank_positions
+
+    def latest(self, columns=None):
+        """Latest row for each bank, optionally restricted to columns"""
+        if columns is None:
+            return self._df.loc[self.latest_index]
+        return self._df.loc[self.latest_index, columns]
+
+    def period_rows(self, period, columns=None):
+        """All rows for one period"""
+        positions = self.period_positions.get(period, np.array([], dtype=np.intp))
+        rows = self._df.iloc[positions]
+        if columns is None:
+            return rows
+        return rows[columns]
+
+    def bank_rows(self, bank, columns=None):
+        """All rows for one bank, oldest period first (a slice, not a scan)"""
+        positions = self.bank_positions.get(bank, np.array([], dtype=np.intp))
+        rows = self._df.iloc[positions]
+        if columns is None:
+            return rows
+        return rows[columns]
+
+    def lookup(self, bank, period, columns=None):
+        """Rows for one (bank, period): the bank's slice filtered on period"""
+        rows = self.bank_rows(bank)
+        rows = rows[(rows['period'] == period).to_numpy()]
+        if columns is None:
+            return rows
+        return rows[columns]
+
+    def content_hash(self, columns):
+        """
+        Content hash (16 hex chars) of the given columns that the table
+        has, computed once per column set and data version
+        """
+        cols = [col for col in columns if col in self._df.columns]
+        key = tuple(cols)
+        if key not in self._hashes:
+            # Hash metrics at float32 so compact and float64 copies match
+            frame = self._df[cols].astype({col: 'float32' for col in cols if SCHEMA.get(col, float) is float})
+            row_hashes = pd.util.hash_pandas_object(frame, index=False)
+            digest = hashlib.sha256(row_hashes.to_numpy().tobytes())
+            digest.update(','.join(cols).encode())
+            self._hashes[key] = digest.hexdigest()[:16]
+        return self._hashes[key]
+
+    @property
+    def data_hash(self):
+        """
+        Content hash of PANEL_COLUMNS, the key for derived artifacts
+
+        A fixed column set, so a panel over the analytic projection (the
+        dashboard) and one over the full table (analytics.py, pipeline)
+        share a key. It includes WEIGHT_COLUMN when present, which the
+        weighted system aggregates depend on.
+        """
+        return self.content_hash(PANEL_COLUMNS)
+
+    @property
+    def latest_period(self):
+        """Chronologically latest period label in the table"""
+        if len(self._df) == 0:
+            return None
+        return self._df['period'].iloc[self._df['period_key'].to_numpy().argmax()]
+
+    def __len__(self):
+        return len(self._df)
+
+
+class PanelTensor(BankPanel):
+    """
+    Dense (banks, periods, metrics) array view of the panel
+    
+    Banks follow bank_list.get_all_banks() order and periods follow
+    QUARTERS chronologically; banks and periods in the data but outside
+    the universe are appended. Missing values are NaN in `values` and
+    masked in masked(); `present` marks which (bank, period) rows exist.
+    
+    Being a BankPanel, it can be passed to every analytics engine. The
+    latest row per bank is then an axis reduction over `present` instead
+    of a groupby. The array is rebuilt lazily after replace()/upsert().
+    """
+    
+    METRICS = ['gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
+    
+    def __init__(self, df, copy=True, banks=None, periods=None):
+        """
+        Args:
+            df (pd.DataFrame): Tidy table
+            copy (bool): Copy df before adding period columns
+            banks (list): Bank axis (default: full bank_list universe)
+            periods (list): Period axis (default: bank_list.QUARTERS)
+        """
+        self._axes = (banks, periods)
+        self._tensor = None
+        super().__init__(df, copy=copy)
+    
+    def invalidate(self):
+        super().invalidate()
+        self._tensor = None
+    
+    def _state(self):
+        if self._tensor is None:
+            self._tensor = self._build()
+        return self._tensor
+    
+    def _build(self):
+        df = self._df
+        banks, periods = self._axes
+        banks = list(get_all_banks(include_optional=True) if banks is None else banks)
+        periods = list(QUARTERS if periods is None else periods)
+        # Rows without a bank or period have no cell in the array
+        data_banks = pd.unique(df['bank'].dropna().to_numpy())
+        data_periods = pd.unique(df['period'].dropna().to_numpy())
+        known = set(banks)
+        banks += sorted(bank for bank in data_banks if bank not in known)
+        known = set(periods)
+        periods += [p for p in data_periods if p not in known]
+        
+        encoded = encode_periods(periods)
+        order = np.argsort(encoded['period_key'].to_numpy(), kind='stable')
+        periods = pd.Index(np.asarray(periods, dtype=object)[order], name='period')
+        period_keys = encoded['period_key'].to_numpy()[order]
+        quarter = encoded['quarter'].to_numpy()[order]
+        # Quarter index for slopes (full-year rows sit on their Q4)
+        t = encoded['fiscal_year'].to_numpy()[order] * 4 + np.where(quarter == 0, 4, quarter) - 1
+        banks = pd.Index(banks, name='bank')
+        
+        bank_codes = banks.get_indexer(df['bank'].to_numpy())
+        period_codes = periods.get_indexer(df['period'].to_numpy())
+        rows = np.flatnonzero((bank_codes >= 0) & (period_codes >= 0))
+        bank_codes, period_codes = bank_codes[rows], period_codes[rows]
+        values = np.full((len(banks), len(periods), len(self.METRICS)), np.nan)
+        values[bank_codes, period_codes] = df[self.METRICS].to_numpy(dtype=float)[rows]
+        row_pos = np.full((len(banks), len(periods)), -1, dtype=np.intp)
+        row_pos[bank_codes, period_codes] = rows
+        
+        return {
+            'banks': banks,
+            'periods': periods,
+            'bank_index': {bank: i for i, bank in enumerate(banks)},
+            'period_index': {period: j for j, period in enumerate(periods)},
+            'values': values,
+            'row_pos': row_pos,
+            'period_keys': period_keys,
+            't': (t - t.min() if len(t) else t).astype(float),
+        }
+    
+    @property
+    def banks(self):
+        return self._state()['banks']
+    
+    @property
+    def periods(self):
+        return self._state()['periods']
+    
+    @property
+    def bank_index(self):
+        """{bank: position on axis 0}"""
+        return self._state()['bank_index']
+    
+    @property
+    def period_index(self):
+        """{period: position on axis 1}"""
+        return self._state()['period_index']
+    
+    @property
+    def values(self):
+        """(banks, periods, metrics) float array, NaN = missing"""
+        return self._state()['values']
+    
+    @property
+    def present(self):
+        """(banks, periods) bool array: a row exists for this bank-period"""
+        return self._state()['row_pos'] >= 0
+    
+    def masked(self):
+        """values as a numpy masked array (missing = masked)"""
+        return np.ma.masked_invalid(self.values)
+    
+    def metric(self, metric):
+        """banks × periods DataFrame for one metric"""
+        return pd.DataFrame(self.values[:, :, self.METRICS.index(metric)],
+                            index=self.banks, columns=self.periods)
+    
+    def _latest_positions(self):
+        # Highest period_key per bank; ties (e.g. unparseable periods, all
+        # key -1) go to the earliest row, as in BankPanel.latest_index
+        row_pos = self._state()['row_pos']
+        present = row_pos >= 0
+        keyed = np.where(present, self._state()['period_keys'].astype(np.int64), np.iinfo(np.int64).min)
+        newest = present & (keyed == keyed.max(axis=1, initial=np.iinfo(np.int64).min)[:, np.newaxis])
+        last = np.where(newest, row_pos, np.iinfo(np.intp).max).argmin(axis=1)
+        return present.any(axis=1), last
+    
+    @property
+    def latest_index(self):
+        """Index labels of the latest row for each bank (axis reduction)"""
+        if self._latest_index is None:
+            has_rows, last = self._latest_positions()
+            rows = self._state()['row_pos'][has_rows, last[has_rows]]
+            order = np.argsort(self.banks.to_numpy()[has_rows].astype(str), kind='stable')
+            self._latest_index = self._df.index[rows[order]]
+        return self._latest_index
+    
+    def latest_values(self):
+        """banks × metrics DataFrame of each bank's latest row (banks with data only)"""
+        has_rows, last = self._latest_positions()
+        latest = self.values[np.flatnonzero(has_rows), last[has_rows]]
+        return pd.DataFrame(latest, index=self.banks[has_rows], columns=self.METRICS)
+    
+    def cross_section(self, stat='median'):
+        """
+        Statistic across banks for every period and metric
+        
+        Args:
+            stat (str): 'median', 'mean', 'min', 'max' or 'std'
+        
+        Returns:
+            pd.DataFrame: periods × metrics (NaN where no bank has data)
+        """
+        reduced = getattr(np.ma, stat)(self.masked(), axis=0)
+        return pd.DataFrame(np.ma.filled(reduced.astype(float), np.nan),
+                            index=self.periods, columns=self.METRICS)
+    
+    def slopes(self):
+        """Least-squares slope per quarter for every bank and metric (banks × metrics)"""
+        x = self.values
+        valid = ~np.isnan(x)
+        t = np.where(valid, self._state()['t'][np.newaxis, :, np.newaxis], 0.0)
+        x = np.where(valid, x, 0.0)
+        n, st, sx = valid.sum(axis=1), t.sum(axis=1), x.sum(axis=1)
+        stt, stx = (t * t).sum(axis=1), (t * x).sum(axis=1)
+        denom = n * stt - st * st
+        with np.errstate(divide='ignore', invalid='ignore'):
+            slope = np.where(denom > 0, (n * stx - st * sx) / denom, np.nan)
+        return pd.DataFrame(slope, index=self.banks, columns=self.METRICS)
@@ -0,0 +1,320 @@
+"""
+PIPELINE - Single-pass bank_list → ingest → validate → analytics runner
+=======================================================================
+Project: NPA Analysis Dashboard
+
+Runs STEPS 2-5 as one in-memory DAG instead of four scripts handing off
+CSVs. Each stage's outputs are cached under .pipeline_cache/ keyed by a
+hash of its parameters and its inputs (checklist file contents for
+ingest, upstream output hashes for the rest), so a re-run skips every
+stage whose inputs did not change; cached outputs are only loaded if a
+downstream stage actually has to run.
+
+Final analytics CSVs are always written; intermediate tables
+(bank_directory.csv, bank_metrics.csv, bank_metrics_validated.*) only
+with --keep-intermediate.
+
+USAGE (from src/):
+    python pipeline.py collection_checklist.csv
+    python pipeline.py analyst_a.csv analyst_b.csv --dedup source_date --keep-intermediate
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import time
+import pandas as pd
+from datetime import datetime
+from pathlib import Path
+
+try:
+    from .data_model import VALIDATION_RANGES, save_table
+    from .bank_list import bank_directory, get_all_banks, QUARTERS
+    from .ingest import combine_checklists
+    from .validate import DataValidator, RULES
+    from .panel import BankPanel
+    from .analytics import AssetQualityAnalytics, PeerComparisonAnalytics
+    from .artifacts import ArtifactStore
+except ImportError:  # run as a script from src/
+    from data_model import VALIDATION_RANGES, save_table
+    from bank_list import bank_directory, get_all_banks, QUARTERS
+    from ingest import combine_checklists
+    from validate import DataValidator, RULES
+    from panel import BankPanel
+    from analytics import AssetQualityAnalytics, PeerComparisonAnalytics
+    from artifacts import ArtifactStore
+
+# Bump when a stage's logic changes so cached outputs are recomputed
+PIPELINE_VERSION = 2
+
+# Stage -> upstream outputs it reads and outputs it produces (in run order)
+STAGES = {
+    'bank_list': {'inputs': [], 'outputs': ['banks']},
+    'ingest': {'inputs': ['banks'], 'outputs': ['tidy', 'unlisted']},
+    'validate': {'inputs': ['tidy'], 'outputs': ['valid', 'quarantined', 'issues']},
+    'analytics': {'inputs': ['valid'], 'outputs': ['rankings', 'quadrant', 'spread']},
+}
+
+# Output -> files written for it (save_table picks the format by extension)
+INTERMEDIATE_FILES = {
+    'banks': ['bank_directory.csv'],
+    'tidy': ['bank_metrics.csv'],
+    'valid': ['bank_metrics_validated.csv', 'bank_metrics_validated.parquet'],
+    'issues': ['validation_issues.csv'],
+    'unlisted': ['unlisted_rows.csv'],
+}
+FINAL_FILES = {
+    'rankings': ['analytics_rankings.csv'],
+    'quadrant': ['analytics_quadrant.csv'],
+    'spread': ['analytics_spread.csv'],
+}
+
+
+def _digest(*parts):
+    """16-hex-char hash of JSON-serialisable parts"""
+    payload = json.dumps(parts, sort_keys=True, default=str).encode()
+    return hashlib.sha256(payload).hexdigest()[:16]
+
+
+def frame_digest(df):
+    """Content hash of a DataFrame (values and column names, not the index)"""
+    digest = hashlib.sha256(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    digest.update(','.join(map(str, df.columns)).encode())
+    return digest.hexdigest()[:16]
+
+
+def file_digest(path, block_size=1 << 20):
+    """Content hash of a file"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()[:16]
+
+
+# ===== STAGES =====
+
+def run_bank_list(inputs, config):
+    return {'banks': bank_directory(include_optional=config['include_optional'])}
+
+
+def run_ingest(inputs, config):
+    frames = [pd.read_csv(path, dtype={'source_url': str, 'source_date': str})
+              for path in config['checklists']]
+    tidy = combine_checklists(frames, dedup=config['dedup'])
+    # Rows of banks outside the bank_list universe are kept (like
+    # merge_filled_data) unless universe_only; either way they are listed
+    listed = tidy['bank'].isin(inputs['banks']['bank_code']).to_numpy()
+    unlisted = tidy.loc[~listed, ['bank', 'period']].reset_index(drop=True)
+    if config['universe_only']:
+        tidy = tidy[listed].reset_index(drop=True)
+    return {'tidy': tidy, 'unlisted': unlisted}
+
+
+def run_validate(inputs, config):
+    validator = DataValidator(inputs['tidy'])
+    for key in RULES:
+        validator.apply_rule(key)
+    valid, quarantined = validator.get_valid_data(return_quarantined=True)
+    return {'valid': valid.reset_index(drop=True),
+            'quarantined': quarantined.reset_index(drop=True),
+            'issues': validator.issues}
+
+
+def run_analytics(inputs, config):
+    panel = BankPanel(inputs['valid'])
+    peer = PeerComparisonAnalytics(panel)
+    return {'rankings': peer.latest_rankings().reset_index(drop=True),
+            'quadrant': peer.quadrant_view().reset_index(drop=True),
+            'spread': AssetQualityAnalytics(panel).spread_analysis().reset_index(drop=True)}
+
+
+STAGE_FUNCTIONS = {
+    'bank_list': run_bank_list,
+    'ingest': run_ingest,
+    'validate': run_validate,
+    'analytics': run_analytics,
+}
+
+
+def _fingerprints(config):
+    """Per-stage parameters that, with the input hashes, key the cache"""
+    return {
+        'bank_list': [get_all_banks(config['include_optional']), QUARTERS],
+        'ingest': [config['dedup'], config['universe_only'],
+                   [file_digest(path) for path in config['checklists']]],
+        'validate': [sorted(RULES), VALIDATION_RANGES],
+        'analytics': [],
+    }
+
+
+# ===== CACHE =====
+
+class StageCache:
+    """Stage outputs as Parquet under <root>/<stage>-<key>/ plus a manifest"""
+
+    def __init__(self, root='.pipeline_cache'):
+        self.root = Path(root)
+
+    def path(self, stage, key):
+        return self.root / f"{stage}-{key}"
+
+    def manifest(self, stage, key):
+        """Manifest of a cached run, or None on a miss"""
+        path = self.path(stage, key) / 'manifest.json'
+        return json.loads(path.read_text()) if path.exists() else None
+
+    def save(self, stage, key, outputs, digests):
+        """Write outputs, then the manifest (so partial writes are misses)"""
+        out_dir = self.path(stage, key)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for name, frame in outputs.items():
+            frame.to_parquet(out_dir / f"{name}.parquet", index=False)
+        manifest = {
+            'stage': stage,
+            'pipeline_version': PIPELINE_VERSION,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'digests': digests,
+            'rows': {name: len(frame) for name, frame in outputs.items()},
+        }
+        (out_dir / 'manifest.json').write_text(json.dumps(manifest, indent=2))
+
+    def load(self, stage, key, name):
+        return pd.read_parquet(self.path(stage, key) / f"{name}.parquet")
+
+
+# ===== RUNNER =====
+
+def run_pipeline(checklists=('collection_checklist.csv',), dedup='last', include_optional=False,
+                 universe_only=False, out_dir='.', keep_intermediate=False, cache=None, force=False,
+                 artifacts=False):
+    """
+    Run bank_list → ingest → validate → analytics in memory
+
+    Args:
+        checklists (list): Filled checklist CSVs, in priority order
+        dedup (str): Duplicate rule across checklists (see merge_checklists)
+        include_optional (bool): Include OPTIONAL_BANKS in the universe
+        universe_only (bool): Drop rows of banks outside the universe
+                              (always listed in the 'unlisted' output)
+        out_dir (str): Directory for written files
+        keep_intermediate (bool): Also write INTERMEDIATE_FILES
+        cache (StageCache): Stage cache (None = no caching)
+        force (bool): Run every stage even on a cache hit (and refresh it)
+        artifacts (bool): Also build the dashboard artifacts (artifacts.py)
+
+    Returns:
+        (dict, pd.DataFrame): final outputs by name, and a per-stage
+        report (stage, status, seconds, rows)
+    """
+    config = {'checklists': [str(path) for path in checklists], 'dedup': dedup,
+              'include_optional': include_optional, 'universe_only': universe_only}
+    fingerprints = _fingerprints(config)
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+
+    values = {}    # output name -> DataFrame (in memory)
+    digests = {}   # output name -> content hash
+    cached_in = {}  # output name -> (stage, key) of the cache entry holding it
+
+    def materialise(name):
+        if name not in values:
+            values[name] = cache.load(*cached_in[name], name)
+        return values[name]
+
+    report = []
+    for stage, spec in STAGES.items():
+        started = time.perf_counter()
+        key = _digest(PIPELINE_VERSION, stage, fingerprints[stage],
+                      [digests[name] for name in spec['inputs']])
+        manifest = None if cache is None or force else cache.manifest(stage, key)
+        if manifest is not None:
+            digests.update(manifest['digests'])
+            cached_in.update({name: (stage, key) for name in spec['outputs']})
+            status, rows = 'cached', manifest['rows']
+        else:
+            inputs = {name: materialise(name) for name in spec['inputs']}
+            outputs = STAGE_FUNCTIONS[stage](inputs, config)
+            stage_digests = {name: frame_digest(frame) for name, frame in outputs.items()}
+            if cache is not None:
+                cache.save(stage, key, outputs, stage_digests)
+            values.update(outputs)
+            digests.update(stage_digests)
+            status, rows = 'run', {name: len(frame) for name, frame in outputs.items()}
+        report.append({'stage': stage, 'status': status,
+                       'seconds': time.perf_counter() - started, 'rows': rows})
+
+    started = time.perf_counter()
+    files = dict(FINAL_FILES, **(INTERMEDIATE_FILES if keep_intermediate else {}))
+    for name, paths in files.items():
+        for path in paths:
+            save_table(materialise(name), out_dir / path, verbose=False)
+    report.append({'stage': 'write', 'status': 'run', 'seconds': time.perf_counter() - started,
+                   'rows': {name: len(values[name]) for name in files}})
+
+    if artifacts:
+        started = time.perf_counter()
+        panel = BankPanel(materialise('valid'))
+        store = ArtifactStore(out_dir / 'artifacts')
+        status = 'cached' if store.exists(panel.data_hash) else 'run'
+        store.build_or_load(panel)
+        report.append({'stage': 'artifacts', 'status': status,
+                       'seconds': time.perf_counter() - started, 'rows': {}})
+
+    final = {name: materialise(name) for name in FINAL_FILES}
+    return final, pd.DataFrame(report)
+
+
+def print_report(report):
+    """Print per-stage status and timings"""
+    print("\n" + "="*70)
+    print("PIPELINE RUN")
+    print("="*70)
+    for row in report.itertuples():
+        icon = '♻️ ' if row.status == 'cached' else '▶️ '
+        rows = ', '.join(f"{name}={n}" for name, n in row.rows.items())
+        print(f"  {icon} {row.stage:10} {row.status:7} {row.seconds * 1000:9.1f} ms   {rows}")
+    print("-" * 70)
+    unlisted = report.loc[report['stage'] == 'ingest', 'rows'].iloc[0].get('unlisted', 0)
+    if unlisted:
+        print(f"  ⚠️  {unlisted} row(s) for banks outside the bank list "
+              f"(--include-optional / --universe-only)")
+    print(f"  Total: {report['seconds'].sum() * 1000:.1f} ms "
+          f"({(report['status'] == 'cached').sum()} stage(s) from cache)")
+    print("="*70 + "\n")
+
+
+# ===== MAIN EXECUTION =====
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run bank_list → ingest → validate → analytics in one pass")
+    parser.add_argument('checklists', nargs='*', default=['collection_checklist.csv'],
+                        help="Filled checklist CSVs, in priority order")
+    parser.add_argument('--dedup', choices=['last', 'source_date'], default='last',
+                        help="Which duplicate (bank, quarter) row wins across checklists")
+    parser.add_argument('--include-optional', action='store_true', help="Include optional banks")
+    parser.add_argument('--universe-only', action='store_true',
+                        help="Drop rows of banks outside the bank list (they are reported either way)")
+    parser.add_argument('--out-dir', default='.', help="Directory for output files")
+    parser.add_argument('--keep-intermediate', action='store_true',
+                        help="Also write bank_directory, bank_metrics and bank_metrics_validated")
+    parser.add_argument('--artifacts', action='store_true', help="Also build dashboard artifacts")
+    parser.add_argument('--cache-dir', default='.pipeline_cache', help="Stage cache directory")
+    parser.add_argument('--no-cache', action='store_true', help="Run without the stage cache")
+    parser.add_argument('--force', action='store_true', help="Re-run every stage and refresh the cache")
+    args = parser.parse_args()
+
+    print("\n🔁 PIPELINE: STEPS 2-5 IN ONE PASS")
+    try:
+        final, report = run_pipeline(
+            args.checklists, dedup=args.dedup, include_optional=args.include_optional,
+            universe_only=args.universe_only,
+            out_dir=args.out_dir, keep_intermediate=args.keep_intermediate,
+            cache=None if args.no_cache else StageCache(args.cache_dir),
+            force=args.force, artifacts=args.artifacts)
+    except FileNotFoundError as e:
+        print(f"❌ File not found: {e.filename}")
+        print("   Fill collection_checklist.csv (bank_list.py, ingest.py) first")
+        sys.exit(1)
+    print_report(report)
+    print(f"✅ Outputs written to: {Path(args.out_dir).resolve()}")
@@ -0,0 +1,253 @@
+"""
+KEYED STORE - Upsertable tidy table keyed on (bank, period)
+============================================================
+Project: NPA Analysis Dashboard
+
+The storage layer under data_model's flat tables. The tidy table is kept
+as one Parquet file per partition (per bank, or per fiscal year), and
+each partition has a key index listing its (bank, period) keys:
+
+    bank_metrics_store/
+    ├── store.json              partition scheme
+    ├── _index/
+    │   ├── bank=SBI.parquet    bank, period, period_key
+    │   └── bank=HDFC.parquet ...
+    ├── bank=SBI.parquet
+    └── bank=HDFC.parquet ...
+
+An upsert or delete rewrites only the partitions its keys fall in, plus
+those partitions' index files. Point lookups and bank histories read only
+the partitions the index points to. A partition file is written to a
+temporary name and renamed before its index file. If a write is
+interrupted in between, rebuild_index() recovers the index from the
+partitions.
+"""
+
+import json
+import os
+import re
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+try:
+    from .data_model import SCHEMA, PERIOD_COLUMNS, add_period_columns, encode_periods, \
+        upsert_rows, save_table, load_table
+except ImportError:  # run as a script from src/
+    from data_model import SCHEMA, PERIOD_COLUMNS, add_period_columns, encode_periods, \
+        upsert_rows, save_table, load_table
+
+PARTITION_SCHEMES = ['bank', 'fiscal_year']
+STORE_KEYS = ['bank', 'period']
+KEY_COLUMNS = ['bank', 'period', 'period_key']
+INDEX_COLUMNS = KEY_COLUMNS + ['partition']
+INDEX_DIR = '_index'
+MANIFEST_FILE = 'store.json'
+
+
+class TidyStore:
+    """(bank, period)-keyed tidy table partitioned on disk"""
+
+    def __init__(self, root='bank_metrics_store', partition_by=None):
+        """
+        Args:
+            root (str): Store directory (created if missing)
+            partition_by (str): 'bank' or 'fiscal_year' for a new store
+                                (default 'bank'); an existing store keeps
+                                its scheme and a conflicting value raises
+        """
+        self.root = Path(root)
+        manifest = self.root / MANIFEST_FILE
+        if manifest.exists():
+            stored = json.loads(manifest.read_text())['partition_by']
+            if partition_by not in (None, stored):
+                raise ValueError(f"Store at {self.root} is partitioned by '{stored}', not '{partition_by}'")
+            partition_by = stored
+        else:
+            partition_by = partition_by or 'bank'
+            if partition_by not in PARTITION_SCHEMES:
+                raise ValueError(f"partition_by must be one of {PARTITION_SCHEMES}")
+            self.root.mkdir(parents=True, exist_ok=True)
+            manifest.write_text(json.dumps({'partition_by': partition_by}, indent=2))
+        (self.root / INDEX_DIR).mkdir(exist_ok=True)
+        self.partition_by = partition_by
+        self._keys = None
+        self._index = None
+
+    # ----- index -----
+
+    @property
+    def partition_keys(self):
+        """partition -> its keys (bank, period, period_key), read once"""
+        if self._keys is None:
+            self._keys = {path.stem: load_table(path)[KEY_COLUMNS]
+                          for path in self._parquet_files(self.root / INDEX_DIR)}
+        return self._keys
+
+    @property
+    def index(self):
+        """Every stored key with its partition, ordered by bank and period"""
+        if self._index is None:
+            frames = [keys.assign(partition=name) for name, keys in self.partition_keys.items()]
+            if frames:
+                index = pd.concat(frames, ignore_index=True)
+                self._index = index.sort_values(['bank', 'period_key'], kind='stable').reset_index(drop=True)
+            else:
+                self._index = pd.DataFrame({col: pd.Series(dtype=object) for col in INDEX_COLUMNS})
+        return self._index
+
+    def _set_keys(self, partition, keys):
+        """Record and persist one partition's keys (None = partition removed)"""
+        path = self.root / INDEX_DIR / f"{partition}.parquet"
+        if keys is None:
+            self.partition_keys.pop(partition, None)
+            path.unlink(missing_ok=True)
+        else:
+            keys = keys[KEY_COLUMNS].reset_index(drop=True)
+            self._write_atomic(keys, path)
+            self.partition_keys[partition] = keys
+        self._index = None
+
+    def rebuild_index(self):
+        """Recreate every partition's key index from the partition files"""
+        for path in self._parquet_files(self.root / INDEX_DIR):
+            path.unlink()
+        self._keys = {}
+        for path in self._parquet_files(self.root):
+            self._set_keys(path.stem, load_table(path, columns=KEY_COLUMNS))
+        self._index = None
+        return self.index
+
+    def __len__(self):
+        return sum(len(keys) for keys in self.partition_keys.values())
+
+    # ----- partitions -----
+
+    def _partition_names(self, df):
+        if self.partition_by == 'bank':
+            codes = df['bank'].astype(str).map(lambda code: re.sub(r'[^A-Za-z0-9_-]', '_', code))
+            return 'bank=' + codes
+        return 'fiscal_year=' + df['fiscal_year'].astype(str)
+
+    def _partitions_of(self, bank, period=None):
+        """Partitions that may hold rows of bank (for one period, if given)"""
+        if self.partition_by == 'bank':
+            candidates = self._partition_names(pd.DataFrame({'bank': [bank]})).tolist()
+        elif period is not None:
+            encoded = encode_periods(pd.Series([period]))
+            candidates = self._partition_names(encoded).tolist()
+        else:
+            candidates = list(self.partition_keys)
+        keys = self.partition_keys
+        return [name for name in candidates
+                if name in keys and (keys[name]['bank'].to_numpy() == bank).any()]
+
+    def _path(self, partition):
+        return self.root / f"{partition}.parquet"
+
+    @staticmethod
+    def _parquet_files(directory):
+        return sorted(path for path in directory.glob('*.parquet') if not path.name.startswith('.tmp-'))
+
+    def _write_atomic(self, df, path):
+        tmp_path = path.with_name(f".tmp-{os.getpid()}-{path.name}")
+        save_table(df, tmp_path, verbose=False)
+        os.replace(tmp_path, path)
+
+    def _read(self, partitions, columns=None, banks=None, periods=None):
+        frames = [load_table(self._path(name), columns=columns, banks=banks, periods=periods)
+                  for name in partitions]
+        if not frames:
+            columns = columns or list(SCHEMA) + list(PERIOD_COLUMNS)
+            return pd.DataFrame({col: pd.Series(dtype=object) for col in columns})
+        return pd.concat(frames, ignore_index=True)
+
+    # ----- writes -----
+
+    def upsert(self, delta):
+        """
+        Insert or replace rows keyed on (bank, period)
+
+        Only partitions containing delta keys (and their key indexes) are
+        rewritten (last duplicate in delta wins).
+
+        Returns:
+            dict: inserted, updated and partitions_written counts
+        """
+        columns = [col for col in SCHEMA if col in delta.columns]
+        delta = add_period_columns(delta[columns].copy(), overwrite=True)
+        delta = delta.drop_duplicates(STORE_KEYS, keep='last')
+        partitions = self._partition_names(delta)
+
+        inserted = 0
+        for name, rows in delta.groupby(partitions.to_numpy(), sort=False):
+            path = self._path(name)
+            current = load_table(path) if path.exists() else rows.iloc[:0]
+            merged, _, replaced = upsert_rows(current, rows)
+            self._write_atomic(merged, path)
+            self._set_keys(name, merged)
+            inserted += len(rows) - int(replaced.sum())
+
+        return {'inserted': inserted, 'updated': len(delta) - inserted,
+                'partitions_written': int(partitions.nunique())}
+
+    def delete(self, keys):
+        """
+        Delete rows by key
+
+        Args:
+            keys (pd.DataFrame or list): bank/period columns, or
+                                         (bank, period) tuples
+
+        Returns:
+            int: Number of rows deleted
+        """
+        keys = keys[STORE_KEYS] if isinstance(keys, pd.DataFrame) else pd.DataFrame(list(keys), columns=STORE_KEYS)
+        doomed = pd.MultiIndex.from_frame(keys)
+        partitions = pd.unique(self._partition_names(add_period_columns(keys.copy())))
+
+        deleted = 0
+        for name in [name for name in partitions if name in self.partition_keys]:
+            hit = pd.MultiIndex.from_frame(self.partition_keys[name][STORE_KEYS]).isin(doomed)
+            if not hit.any():
+                continue
+            current = load_table(self._path(name))
+            kept = current[~pd.MultiIndex.from_frame(current[STORE_KEYS]).isin(doomed)]
+            if len(kept):
+                self._write_atomic(kept, self._path(name))
+                self._set_keys(name, kept)
+            else:
+                self._path(name).unlink()
+                self._set_keys(name, None)
+            deleted += int(hit.sum())
+        return deleted
+
+    # ----- reads -----
+
+    def get(self, bank, period, columns=None):
+        """One (bank, period) row from its partition (empty frame if absent)"""
+        return self._read(self._partitions_of(bank, period), columns, banks=[bank], periods=[period])
+
+    def history(self, bank, columns=None):
+        """All rows of one bank, oldest first, reading only its partitions"""
+        rows = self._read(self._partitions_of(bank), banks=[bank])
+        rows = rows.sort_values('period_key', kind='stable').reset_index(drop=True)
+        return rows if columns is None else rows[columns]
+
+    def read(self, columns=None, banks=None, periods=None):
+        """
+        The stored table, or the part matching banks/periods (partitions
+        without matching keys are never opened)
+        """
+        index = self.index
+        mask = np.ones(len(index), dtype=bool)
+        if banks is not None:
+            mask &= index['bank'].isin(banks).to_numpy()
+        if periods is not None:
+            mask &= index['period'].isin(periods).to_numpy()
+        partitions = pd.unique(index.loc[mask, 'partition'])
+        read_cols = None if columns is None else list(dict.fromkeys(list(columns) + list(PERIOD_COLUMNS)))
+        table = self._read(partitions, read_cols, banks=banks, periods=periods)
+        if 'period_key' in table.columns:
+            table = table.sort_values(['bank', 'period_key'], kind='stable').reset_index(drop=True)
+        return table if columns is None else table[list(columns)]
@@ -11,107 +11,237 @@ Quality rules:
 3. CASA range: 0% - 100% (must be valid percentage)
 4. GNPA range: 0% - 15% (flag unusually high)
 5. No missing core metrics
-6. NNPA ≤ GNPA
+6. NNPA range: 0% - 3% (flag outliers)
 """
 
 import pandas as pd
+import numpy as np
 import sys
+from collections.abc import Sequence
+
+try:
+    from .data_model import VALIDATION_RANGES, has_integer_labels, save_table, upsert_rows
+    from .store import TidyStore
+except ImportError:  # run as a script from src/
+    from data_model import VALIDATION_RANGES, has_integer_labels, save_table, upsert_rows
+    from store import TidyStore
+
+CORE_METRICS = ['gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
+
+# Column layout of DataValidator.issues (one row per rule violation)
+ISSUE_COLUMNS = ['row', 'bank', 'period', 'rule', 'severity'] + CORE_METRICS
+
+
+def _range_bounds(col):
+    """(min, max) for a metric from data_model.VALIDATION_RANGES"""
+    low, high, _ = VALIDATION_RANGES[col]
+    return low, high
+
+
+def _missing_detail(rec):
+    missing_cols = [col for col in CORE_METRICS if pd.isnull(rec[col])]
+    return f"Missing: {', '.join(missing_cols)}"
+
+
+# ===== RULE DEFINITIONS =====
+# Each rule is declared once: a vectorized mask over the frame plus the
+# label/severity/detail used when reporting. Range bounds come from
+# data_model.VALIDATION_RANGES so the two never drift apart.
+RULES = {
+    'rule_1': {
+        'label': '1: GNPA < NNPA',
+        'severity': 'ERROR',
+        'mask': lambda df: df['gnpa_pct'] < df['nnpa_pct'],
+        'detail': lambda r: f"GNPA={r['gnpa_pct']:.2f}% but NNPA={r['nnpa_pct']:.2f}%",
+    },
+    'rule_2': {
+        'label': '2: NIM out of range',
+        'severity': 'WARNING',
+        'mask': lambda df: ~df['nim_pct'].between(*_range_bounds('nim_pct')) & df['nim_pct'].notna(),
+        'detail': lambda r: "NIM={:.2f}% (expected {}-{}%)".format(r['nim_pct'], *_range_bounds('nim_pct')),
+    },
+    'rule_3': {
+        'label': '3: Invalid CASA',
+        'severity': 'ERROR',
+        'mask': lambda df: ~df['casa_pct'].between(*_range_bounds('casa_pct')) & df['casa_pct'].notna(),
+        'detail': lambda r: "CASA={:.2f}% (must be {}-{}%)".format(r['casa_pct'], *_range_bounds('casa_pct')),
+    },
+    'rule_4': {
+        'label': '4: High GNPA',
+        'severity': 'WARNING',
+        'mask': lambda df: df['gnpa_pct'] > _range_bounds('gnpa_pct')[1],
+        'detail': lambda r: "GNPA={:.2f}% (unusually high, typically <{}%)".format(r['gnpa_pct'], _range_bounds('gnpa_pct')[1]),
+    },
+    'rule_5': {
+        'label': '5: Missing values',
+        'severity': 'ERROR',
+        'mask': lambda df: df[CORE_METRICS].isnull().any(axis=1),
+        'detail': _missing_detail,
+    },
+    'rule_6': {
+        'label': '6: NNPA out of range',
+        'severity': 'WARNING',
+        'mask': lambda df: ~df['nnpa_pct'].between(*_range_bounds('nnpa_pct')) & df['nnpa_pct'].notna(),
+        'detail': lambda r: "NNPA={:.2f}% (expected {}-{}%)".format(r['nnpa_pct'], *_range_bounds('nnpa_pct')),
+    },
+}
+
+RULE_BY_LABEL = {rule['label']: rule for rule in RULES.values()}
+
+
+class IssueView(Sequence):
+    """
+    Read-only list-of-dicts view over rows of the issues table.
+    
+    Keeps the old `errors`/`warnings` interface ({'bank', 'period',
+    'rule', 'severity', 'detail'}) while detail strings are only
+    formatted for the rows actually accessed.
+    """
+    
+    def __init__(self, table):
+        self._table = table.reset_index(drop=True)
+    
+    def __len__(self):
+        return len(self._table)
+    
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        rec = self._table.iloc[i]
+        return {
+            'bank': rec['bank'],
+            'period': rec['period'],
+            'rule': rec['rule'],
+            'severity': rec['severity'],
+            'detail': RULE_BY_LABEL[rec['rule']]['detail'](rec),
+        }
+    
+    def __repr__(self):
+        return f"IssueView({len(self)} issues)"
+
 
 class DataValidator:
     """Validate bank metrics data"""
     
     def __init__(self, df):
         self.df = df.copy()
-        self.issues = []
-        self.errors = []
-        self.warnings = []
+        self._rule_issues = {}
+        self._issues = None
+        self._error_mask = None
     
-    def validate_rule_1_gnpa_nnpa(self):
-        """Rule 1: GNPA ≥ NNPA (must always be true)"""
-        violations = self.df['gnpa_pct'] < self.df['nnpa_pct']
+    @property
+    def issues(self):
+        """All violations as one columnar DataFrame (see ISSUE_COLUMNS)"""
+        if self._issues is None:
+            frames = [self._rule_issues[key] for key in RULES if key in self._rule_issues]
+            if frames:
+                self._issues = pd.concat(frames, ignore_index=True)
+            else:
+                self._issues = pd.DataFrame(columns=ISSUE_COLUMNS)
+        return self._issues
+    
+    @property
+    def errors(self):
+        """ERROR-severity issues (list-of-dicts view)"""
+        return IssueView(self.issues[self.issues['severity'] == 'ERROR'])
+    
+    @property
+    def warnings(self):
+        """WARNING-severity issues (list-of-dicts view)"""
+        return IssueView(self.issues[self.issues['severity'] == 'WARNING'])
+    
+    @staticmethod
+    def _evaluate_rule(frame, key):
+        """Violations of one rule in frame as an issues table"""
+        rule = RULES[key]
+        mask = rule['mask'](frame).fillna(False).to_numpy(dtype=bool)
+        idx = np.flatnonzero(mask)
         
-        if violations.any():
-            for idx in self.df[violations].index:
-                row = self.df.loc[idx]
-                self.errors.append({
-                    'bank': row['bank'],
-                    'period': row['period'],
-                    'rule': '1: GNPA < NNPA',
-                    'severity': 'ERROR',
-                    'detail': f"GNPA={row['gnpa_pct']:.2f}% but NNPA={row['nnpa_pct']:.2f}%"
-                })
+        issues = pd.DataFrame({
+            'row': frame.index[idx],
+            'bank': frame['bank'].to_numpy()[idx],
+            'period': frame['period'].to_numpy()[idx],
+            'rule': rule['label'],
+            'severity': rule['severity'],
+        })
+        for col in CORE_METRICS:
+            issues[col] = frame[col].to_numpy()[idx]
+        return issues
+    
+    def apply_rule(self, key):
+        """
+        Evaluate one rule from RULES as a column mask and record its
+        violations in bulk. Re-running a rule replaces its earlier result.
         
-        return len(violations)
+        Returns:
+            int: Number of violating rows
+        """
+        issues = self._evaluate_rule(self.df, key)
+        self._rule_issues[key] = issues
+        self._issues = None
+        self._error_mask = None
+        return len(issues)
     
-    def validate_rule_2_nim_range(self):
-        """Rule 2: NIM in reasonable range (0.5-8%)"""
-        violations = (self.df['nim_pct'] < 0.5) | (self.df['nim_pct'] > 8)
+    def update(self, delta):
+        """
+        Insert or replace (bank, period) rows and re-validate only them
+        
+        Issues for the replaced keys are dropped and every rule already
+        run is evaluated on the delta rows alone. The result matches a
+        full run_all_validations() over the updated table.
         
-        if violations.any():
-            for idx in self.df[violations].index:
-                row = self.df.loc[idx]
-                self.warnings.append({
-                    'bank': row['bank'],
-                    'period': row['period'],
-                    'rule': '2: NIM out of range',
-                    'severity': 'WARNING',
-                    'detail': f"NIM={row['nim_pct']:.2f}% (expected 0.5-8%)"
-                })
+        Args:
+            delta (pd.DataFrame): New or corrected rows
+            
+        Returns:
+            dict: Violations per rule among the delta rows
+        """
+        old_labels = None if has_integer_labels(self.df) else self.df.index
+        self.df, delta, replaced = upsert_rows(self.df, delta)
+        delta_keys = pd.MultiIndex.from_frame(delta[['bank', 'period']])
+        # Non-integer labels were renumbered: follow kept rows to their new label
+        relabel = None
+        if old_labels is not None and len(old_labels):
+            kept_labels = old_labels[~replaced]
+            relabel = pd.Series(np.arange(len(kept_labels)), index=kept_labels)
         
-        return len(violations)
+        counts = {}
+        for key, issues in self._rule_issues.items():
+            stale = pd.MultiIndex.from_frame(issues[['bank', 'period']]).isin(delta_keys)
+            kept = issues[~stale]
+            if relabel is not None:
+                kept = kept.assign(row=relabel.reindex(kept['row']).to_numpy())
+            new_issues = self._evaluate_rule(delta, key)
+            self._rule_issues[key] = pd.concat([kept, new_issues], ignore_index=True)
+            counts[key] = len(new_issues)
+        
+        self._issues = None
+        self._error_mask = None
+        return counts
+    
+    def validate_rule_1_gnpa_nnpa(self):
+        """Rule 1: GNPA ≥ NNPA (must always be true)"""
+        return self.apply_rule('rule_1')
+    
+    def validate_rule_2_nim_range(self):
+        """Rule 2: NIM in reasonable range (0.5-8%)"""
+        return self.apply_rule('rule_2')
     
     def validate_rule_3_casa_range(self):
         """Rule 3: CASA between 0-100%"""
-        violations = (self.df['casa_pct'] < 0) | (self.df['casa_pct'] > 100)
-        
-        if violations.any():
-            for idx in self.df[violations].index:
-                row = self.df.loc[idx]
-                self.errors.append({
-                    'bank': row['bank'],
-                    'period': row['period'],
-                    'rule': '3: Invalid CASA',
-                    'severity': 'ERROR',
-                    'detail': f"CASA={row['casa_pct']:.2f}% (must be 0-100%)"
-                })
-        
-        return len(violations)
+        return self.apply_rule('rule_3')
     
     def validate_rule_4_gnpa_range(self):
         """Rule 4: GNPA reasonably between 0-15%"""
-        violations = self.df['gnpa_pct'] > 15
-        
-        if violations.any():
-            for idx in self.df[violations].index:
-                row = self.df.loc[idx]
-                self.warnings.append({
-                    'bank': row['bank'],
-                    'period': row['period'],
-                    'rule': '4: High GNPA',
-                    'severity': 'WARNING',
-                    'detail': f"GNPA={row['gnpa_pct']:.2f}% (unusually high, typically <15%)"
-                })
-        
-        return len(violations)
+        return self.apply_rule('rule_4')
     
     def validate_rule_5_missing_values(self):
         """Rule 5: No missing core metrics"""
-        core_cols = ['gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
-        missing = self.df[core_cols].isnull().any(axis=1)
-        
-        if missing.any():
-            for idx in self.df[missing].index:
-                row = self.df.loc[idx]
-                missing_cols = [col for col in core_cols if pd.isnull(row[col])]
-                self.errors.append({
-                    'bank': row['bank'],
-                    'period': row['period'],
-                    'rule': '5: Missing values',
-                    'severity': 'ERROR',
-                    'detail': f"Missing: {', '.join(missing_cols)}"
-                })
-        
-        return len(missing)
+        return self.apply_rule('rule_5')
+    
+    def validate_rule_6_nnpa_range(self):
+        """Rule 6: NNPA in reasonable range (0-3%)"""
+        return self.apply_rule('rule_6')
     
     def run_all_validations(self):
         """Run all validation rules"""
@@ -119,13 +249,7 @@ class DataValidator:
         print("RUNNING DATA VALIDATION")
         print("="*70)
         
-        counts = {
-            'rule_1': self.validate_rule_1_gnpa_nnpa(),
-            'rule_2': self.validate_rule_2_nim_range(),
-            'rule_3': self.validate_rule_3_casa_range(),
-            'rule_4': self.validate_rule_4_gnpa_range(),
-            'rule_5': self.validate_rule_5_missing_values(),
-        }
+        counts = {key: self.apply_rule(key) for key in RULES}
         
         return counts
     
@@ -136,51 +260,93 @@ class DataValidator:
         print("="*70)
         
         total_rows = len(self.df)
+        errors, warnings = self.errors, self.warnings
         print(f"\nTotal rows: {total_rows}")
         
         # Summary
         print(f"\n📊 SUMMARY:")
-        print(f"  ✅ PASSED: {total_rows - len(self.errors) - len(self.warnings)}")
-        print(f"  ⚠️  WARNINGS: {len(self.warnings)}")
-        print(f"  ❌ ERRORS: {len(self.errors)}")
+        print(f"  ✅ PASSED: {total_rows - len(errors) - len(warnings)}")
+        print(f"  ⚠️  WARNINGS: {len(warnings)}")
+        print(f"  ❌ ERRORS: {len(errors)}")
         
         # Errors
-        if self.errors:
-            print(f"\n❌ ERRORS ({len(self.errors)} rows have critical issues):")
+        if errors:
+            print(f"\n❌ ERRORS ({len(errors)} rows have critical issues):")
             print("-" * 70)
-            for err in self.errors[:10]:  # Show first 10
+            for err in errors[:10]:  # Show first 10
                 print(f"  {err['bank']:10} {err['period']:10} | {err['rule']:20} | {err['detail']}")
-            if len(self.errors) > 10:
-                print(f"  ... and {len(self.errors)-10} more errors")
+            if len(errors) > 10:
+                print(f"  ... and {len(errors)-10} more errors")
         
         # Warnings
-        if self.warnings:
-            print(f"\n⚠️  WARNINGS ({len(self.warnings)} rows need review):")
+        if warnings:
+            print(f"\n⚠️  WARNINGS ({len(warnings)} rows need review):")
             print("-" * 70)
-            for warn in self.warnings[:10]:  # Show first 10
+            for warn in warnings[:10]:  # Show first 10
                 print(f"  {warn['bank']:10} {warn['period']:10} | {warn['rule']:20} | {warn['detail']}")
-            if len(self.warnings) > 10:
-                print(f"  ... and {len(self.warnings)-10} more warnings")
+            if len(warnings) > 10:
+                print(f"  ... and {len(warnings)-10} more warnings")
         
         # Status
         print("\n" + "="*70)
-        if len(self.errors) == 0:
-            if len(self.warnings) == 0:
+        if len(errors) == 0:
+            if len(warnings) == 0:
                 print("✅ VALIDATION PASSED - All checks successful!")
             else:
                 print("✅ VALIDATION PASSED - With warnings (review before use)")
         else:
-            print(f"❌ VALIDATION FAILED - {len(self.errors)} critical issues to fix")
+            print(f"❌ VALIDATION FAILED - {len(errors)} critical issues to fix")
         print("="*70 + "\n")
     
-    def get_valid_data(self):
-        """Get only valid rows (errors only, exclude warnings)"""
-        # Filter out error rows
-        valid_df = self.df.copy()
-        for err in self.errors:
-            valid_df = valid_df[~((valid_df['bank'] == err['bank']) & 
-                                   (valid_df['period'] == err['period']))]
+    @property
+    def error_mask(self):
+        """
+        Boolean row mask over self.df: True where the row's (bank, period)
+        has at least one ERROR. Computed once per validation run.
+        """
+        if self._error_mask is None:
+            errors = self.issues[self.issues['severity'] == 'ERROR']
+            if len(errors) == 0:
+                self._error_mask = np.zeros(len(self.df), dtype=bool)
+            else:
+                keys = pd.MultiIndex.from_frame(self.df[['bank', 'period']])
+                error_keys = pd.MultiIndex.from_frame(errors[['bank', 'period']])
+                self._error_mask = keys.isin(error_keys)
+        return self._error_mask
+    
+    def get_valid_data(self, return_quarantined=False):
+        """
+        Get only valid rows (errors only, exclude warnings)
+        
+        Every row sharing a (bank, period) key with an error row is dropped,
+        selected in one pass with error_mask.
+        
+        Args:
+            return_quarantined (bool): Also return the rejected rows
+            
+        Returns:
+            pd.DataFrame, or (valid_df, quarantined_df) if return_quarantined
+        """
+        mask = self.error_mask
+        valid_df = self.df[~mask]
+        if return_quarantined:
+            return valid_df, self.df[mask]
         return valid_df
+    
+    def save_to_store(self, store):
+        """
+        Write the validation outcome through a keyed store (store.TidyStore)
+        
+        Valid rows are upserted; keys with errors are deleted so a stale
+        earlier version of a now-failing row does not linger.
+        
+        Returns:
+            dict: upserted and deleted row counts
+        """
+        valid_df, quarantined = self.get_valid_data(return_quarantined=True)
+        deleted = store.delete(quarantined[['bank', 'period']]) if len(quarantined) else 0
+        written = store.upsert(valid_df) if len(valid_df) else {'inserted': 0, 'updated': 0}
+        return {'upserted': written['inserted'] + written['updated'], 'deleted': deleted}
 
 
 # ===== MAIN EXECUTION =====
@@ -205,6 +371,10 @@ if __name__ == "__main__":
     valid_df = validator.get_valid_data()
     valid_df.to_csv('bank_metrics_validated.csv', index=False)
     print(f"✅ Valid data saved to: bank_metrics_validated.csv ({len(valid_df)} rows)")
+    save_table(valid_df, 'bank_metrics_validated.parquet')
+    written = validator.save_to_store(TidyStore('bank_metrics_store'))
+    print(f"✅ Store updated: bank_metrics_store/ ({written['upserted']} upserted, "
+          f"{written['deleted']} quarantined key(s) removed)")
     
     # Ready for next step?
     if len(validator.errors) == 0:
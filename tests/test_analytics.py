@@ -0,0 +1,174 @@
+"""Numeric engines: quadrants, rankings cube, trend summaries, time series"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.analytics import AssetQualityAnalytics, PanelTimeSeries, RankingsCube, classify_quadrants
+from src.data_model import create_empty_dataframe
+from src.panel import PanelTensor
+
+
+def panel(rows):
+    """(bank, period, gnpa, casa) tuples -> tidy table"""
+    df = pd.DataFrame(rows, columns=['bank', 'period', 'gnpa_pct', 'casa_pct'])
+    return df.assign(nnpa_pct=0.5, nim_pct=3.0)
+
+
+# ----- quadrants -----
+
+def test_quadrants_nan_is_worst_and_percentile_split_per_period():
+    df = panel([
+        ('A', '2024-Q4', 1.0, 50.0), ('B', '2024-Q4', 2.0, 40.0), ('C', '2024-Q4', 3.0, 30.0),
+        ('D', '2024-Q4', 3.0, 20.0), ('E', '2024-Q4', np.nan, 60.0),
+        ('A', '2025-Q1', 4.0, 10.0), ('B', '2025-Q1', 3.0, 20.0), ('C', '2025-Q1', 2.0, 30.0),
+        ('D', '2025-Q1', 1.0, np.nan),
+    ])
+    result = classify_quadrants(df, split='percentile', q=75)
+
+    for period, rows in df.groupby('period'):
+        split = result.loc[rows.index]
+        assert (split['x_split'] == rows['casa_pct'].quantile(0.75)).all()
+        assert (split['y_split'] == rows['gnpa_pct'].quantile(0.75)).all()
+    # 2024-Q4 splits: CASA 50, GNPA 3 (E's missing GNPA is skipped)
+    # A sits on the CASA split and C, D on the GNPA split: not "better"
+    assert result['quadrant'].tolist() == [
+        'WATCH', 'WATCH', 'WORST', 'WORST', 'WORST',
+        'WORST', 'WATCH', 'BEST', 'WORST',
+    ]
+
+
+def test_quadrants_fixed_split_and_axis_direction():
+    df = panel([('A', '2025-Q1', 1.0, 50.0), ('B', '2025-Q1', 5.0, 20.0)])
+    default = classify_quadrants(df, split='fixed', thresholds=(30.0, 2.0))
+    flipped = classify_quadrants(df, split='fixed', thresholds=(30.0, 2.0),
+                                 x_higher_is_better=False, y_higher_is_better=True)
+    assert default['quadrant'].tolist() == ['BEST', 'WORST']
+    assert flipped['quadrant'].tolist() == ['WORST', 'BEST']
+    with pytest.raises(ValueError):
+        classify_quadrants(df, split='fixed')
+
+
+# ----- rankings -----
+
+@pytest.mark.parametrize('ties, expected', [
+    ('min', [1, 2, 2, 4]),
+    ('max', [1, 3, 3, 4]),
+    ('dense', [1, 2, 2, 3]),
+    ('first', [1, 2, 3, 4]),
+])
+def test_rankings_ties(ties, expected):
+    df = panel([
+        ('A', '2025-Q1', 1.0, 40.0), ('B', '2025-Q1', 2.0, 40.0), ('C', '2025-Q1', 2.0, 40.0),
+        ('D', '2025-Q1', 3.0, 40.0), ('E', '2025-Q1', np.nan, 40.0),
+    ])
+    cube = RankingsCube(df, ties=ties)
+    assert [cube.rank(bank, '2025-Q1', 'gnpa_pct') for bank in 'ABCDE'] == expected + [0]
+    assert cube.counts[0, cube._metric_pos['gnpa_pct']] == 4
+    # All five tie on CASA
+    assert cube.cross_section('2025-Q1', 'casa_pct')['rank'].nunique() == (5 if ties == 'first' else 1)
+
+
+def test_rankings_direction_movement_and_percentiles():
+    df = panel([
+        ('A', '2024-Q4', 1.0, 30.0), ('B', '2024-Q4', 2.0, 50.0), ('C', '2024-Q4', 3.0, 40.0),
+        ('A', '2025-Q1', 3.0, 30.0), ('B', '2025-Q1', 2.0, 50.0), ('C', '2025-Q1', 1.0, 40.0),
+    ])
+    cube = RankingsCube(df)
+    # Higher CASA is better
+    assert cube.cross_section('2025-Q1', 'casa_pct')['bank'].tolist() == ['B', 'C', 'A']
+    moves = cube.movement('gnpa_pct', '2024-Q4', '2025-Q1').set_index('bank')['change']
+    assert moves.to_dict() == {'C': 2, 'B': 0, 'A': -2}
+    pct = cube.percentiles()[:, cube._period_pos['2025-Q1'], cube._metric_pos['gnpa_pct']]
+    assert pct.tolist() == [0.0, 50.0, 100.0]
+
+
+def test_rankings_keep_unparseable_periods_apart():
+    df = panel([
+        ('A', 'H1 2024', 1.0, 40.0), ('B', 'H1 2024', 2.0, 40.0),
+        ('A', 'H2 2024', 2.0, 40.0), ('B', 'H2 2024', 1.0, 40.0),
+        ('A', '2025-Q1', 1.0, 40.0),
+    ])
+    cube = RankingsCube(df)
+    # Unparseable periods come first, one column each
+    assert list(cube.periods) == ['H1 2024', 'H2 2024', '2025-Q1']
+    assert cube.history('A', 'gnpa_pct').tolist() == [1.0, 2.0, 1.0]
+    assert cube.history('B', 'gnpa_pct').tolist()[:2] == [2.0, 1.0]
+
+
+# ----- trends and time series -----
+
+@pytest.fixture
+def gappy():
+    """A: Q3 missing plus an FY row; B: no quarter before its latest; C: FY only"""
+    return panel([
+        ('A', '2024-Q1', 1.0, 40.0), ('A', '2024-Q2', 1.5, 41.0), ('A', '2024-Q4', 2.5, 43.0),
+        ('A', 'FY2025', 2.6, 43.0), ('A', '2025-Q1', 3.0, 44.0),
+        ('B', '2024-Q1', 4.0, 30.0), ('B', '2024-Q2', 3.0, 31.0), ('B', '2025-Q1', 2.0, 32.0),
+        ('C', 'FY2025', 5.0, 20.0),
+    ])
+
+
+def test_trend_summary_with_missing_quarters_and_full_year_rows(gappy):
+    summary = AssetQualityAnalytics(gappy).trend_summary().set_index('bank')
+
+    # Quarter index: 2024-Q1 = 0 ... 2025-Q1 = 4; FY2025 sits on 2024-Q4
+    expected_slope = np.polyfit([0, 1, 3, 3, 4], [1.0, 1.5, 2.5, 2.6, 3.0], 1)[0]
+    assert summary.loc['A', 'gnpa_pct_slope'] == pytest.approx(expected_slope, rel=1e-5)
+    assert summary.loc['A', 'gnpa_pct_qoq'] == pytest.approx(0.5)
+    assert summary.loc['A', 'gnpa_pct_yoy'] == pytest.approx(2.0)
+    assert summary.loc['A', 'gnpa_pct_direction'] == 1
+    assert summary.loc['A', 'n_periods'] == 5
+
+    # B's previous quarter (2024-Q4) is missing, its year-ago quarter is not
+    assert np.isnan(summary.loc['B', 'gnpa_pct_qoq'])
+    assert summary.loc['B', 'gnpa_pct_yoy'] == pytest.approx(-2.0)
+    assert summary.loc['B', 'trend'] == 'Improving'
+
+    # C has only a full-year row: no slope, no quarterly changes
+    assert np.isnan(summary.loc['C', ['gnpa_pct_slope', 'gnpa_pct_qoq', 'gnpa_pct_yoy']].astype(float)).all()
+    assert summary.loc['C', 'trend'] == 'Stable'
+
+    # The dense tensor puts FY rows on the same quarter axis
+    slopes = PanelTensor(gappy, banks=['A', 'B', 'C'], periods=[]).slopes()
+    assert slopes.loc['A', 'gnpa_pct'] == pytest.approx(expected_slope, rel=1e-5)
+
+
+def test_time_series_lags_are_calendar_quarters(gappy):
+    series = PanelTimeSeries(gappy)
+
+    # Contiguous grid; FY rows and FY-only banks are dropped
+    assert list(series.periods) == ['2024-Q1', '2024-Q2', '2024-Q3', '2024-Q4', '2025-Q1']
+    assert list(series.banks) == ['A', 'B']
+    qoq = series.qoq('gnpa_pct')
+    assert qoq.loc['A', ['2024-Q3', '2024-Q4']].isna().all()
+    assert qoq.loc['A', '2025-Q1'] == pytest.approx(0.5)
+    assert np.isnan(qoq.loc['B', '2025-Q1'])
+    yoy = series.yoy('gnpa_pct')
+    assert yoy.loc['A', '2025-Q1'] == pytest.approx(2.0)
+    assert yoy.loc['B', '2025-Q1'] == pytest.approx(-2.0)
+    assert series.cumulative_change('gnpa_pct').loc['B', '2025-Q1'] == pytest.approx(-2.0)
+
+
+def test_rolling_min_periods(gappy):
+    series = PanelTimeSeries(gappy)
+
+    # Default: a full window of reported quarters
+    assert series.rolling_mean('gnpa_pct', window=2).loc['A'].isna().tolist() == [True, False, True, True, False]
+    # min_periods=0 and 1 accept partial windows; an all-missing window stays NaN
+    for min_periods in (0, 1):
+        rolled = series.rolling_mean('gnpa_pct', window=2, min_periods=min_periods).loc['B']
+        assert rolled.tolist()[:3] == pytest.approx([4.0, 3.5, 3.0])
+        assert np.isnan(rolled['2024-Q4'])
+
+
+@pytest.mark.parametrize('data', ['empty', 'full_year_only'])
+def test_time_series_without_quarters(data):
+    df = create_empty_dataframe() if data == 'empty' else panel([('C', 'FY2025', 5.0, 20.0)])
+    series = PanelTimeSeries(df)
+
+    changes = series.changes()
+    assert len(changes) == 0
+    assert {'bank', 'period', 'gnpa_pct_roll_std', 'casa_pct_cum_change'} <= set(changes.columns)
+    assert series.rolling_mean('gnpa_pct').shape == (0, 0)
+    assert series.cumulative_change('gnpa_pct').shape == (0, 0)
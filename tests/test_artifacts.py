@@ -0,0 +1,42 @@
+"""Page artifacts: system trend aggregates"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.artifacts import system_trend
+from src.data_model import WEIGHT_COLUMN
+from src.panel import BankPanel
+
+
+def test_system_trend_hand_computed():
+    df = pd.DataFrame({
+        'bank': ['A', 'B', 'C', 'D', 'A', 'A'],
+        'period': ['2025-Q1'] * 4 + ['FY2025', '2024-Q4'],
+        'gnpa_pct': [1.0, 2.0, 3.0, 10.0, 1.4, 1.5],
+        'nnpa_pct': 0.5,
+        'nim_pct': [2.0, 3.0, 4.0, np.nan, 3.0, 3.0],
+        'casa_pct': 40.0,
+        WEIGHT_COLUMN: [100.0, 200.0, 300.0, 400.0, 100.0, 100.0],
+    })
+    trend = system_trend(BankPanel(df).df)
+
+    # Chronological, not alphabetical: FY2025 sits after its Q4
+    assert trend['period'].tolist() == ['2024-Q4', 'FY2025', '2025-Q1']
+    assert trend['n_banks'].tolist() == [1, 1, 4]
+
+    q1 = trend.iloc[-1]
+    assert q1['gnpa_pct'] == pytest.approx(4.0)
+    assert q1['gnpa_pct_median'] == pytest.approx(2.5)
+    assert q1['gnpa_pct_std'] == pytest.approx(np.sqrt(50 / 3))
+    assert q1['gnpa_pct_iqr'] == pytest.approx(4.75 - 1.75)
+    assert q1['gnpa_pct_weighted'] == pytest.approx((100 + 400 + 900 + 4000) / 1000)
+    # D's missing NIM drops out of the value and its weight
+    assert q1['nim_pct'] == pytest.approx(3.0)
+    assert q1['nim_pct_weighted'] == pytest.approx((200 + 600 + 1200) / 600)
+
+    # One bank: no spread to measure
+    q4 = trend.iloc[0]
+    assert np.isnan(q4['gnpa_pct_std'])
+    assert q4['gnpa_pct_iqr'] == 0
+    assert q4['gnpa_pct_weighted'] == pytest.approx(1.5)
@@ -0,0 +1,86 @@
+"""Tidy table helpers: compact dtypes, exports and the shared memory-mapped table"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from benchmarks.synthetic import synthetic_panel
+from src.data_model import SCHEMA, compact_dataframe, ensure_mmap, export_table, load_table, \
+    memory_report, open_mmap
+
+
+def test_compact_dataframe_dtypes_and_round_trip():
+    df = synthetic_panel(n_banks=5, n_periods=4, seed=4)
+    df.loc[3, 'gnpa_pct'] = np.nan
+    df['extra'] = 'kept'
+    compact = compact_dataframe(df)
+
+    for col, dtype in SCHEMA.items():
+        expected = 'category' if dtype is str else 'float32'
+        assert str(compact[col].dtype) == expected, col
+    assert compact['extra'].dtype == df['extra'].dtype
+    assert df['gnpa_pct'].dtype == np.float64          # input untouched
+
+    metrics = ['gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct']
+    np.testing.assert_allclose(compact[metrics].to_numpy(dtype=float), df[metrics].to_numpy(),
+                               rtol=1e-6, equal_nan=True)
+    text = [col for col, dtype in SCHEMA.items() if dtype is str]
+    pdt.assert_frame_equal(compact[text].astype(str), df[text].astype(str))
+
+    report = memory_report(df, compact)
+    per_column = report['per_column']
+    assert report['before_bytes'] == per_column['before_bytes'].sum()
+    assert report['after_bytes'] == per_column['after_bytes'].sum()
+    assert report['saved_bytes'] == report['before_bytes'] - report['after_bytes'] > 0
+    assert report['saved_pct'] == pytest.approx(100 * report['saved_bytes'] / report['before_bytes'])
+    assert per_column.loc['gnpa_pct', 'after_bytes'] * 2 == per_column.loc['gnpa_pct', 'before_bytes']
+    assert per_column.loc['bank', 'after_dtype'] == 'category'
+
+
+@pytest.mark.parametrize('name', ['export.csv', 'export.csv.gz', 'export.parquet'])
+def test_export_table_round_trips(name, tmp_path, capsys):
+    if name.endswith('.parquet'):
+        pytest.importorskip('pyarrow')
+    # Parquet goes through save_table, which stores rows by bank and period
+    df = synthetic_panel(n_banks=7, n_periods=3, seed=2)
+    df = df.sort_values(['bank', 'period'], ignore_index=True)
+
+    # chunk_rows smaller than the table: CSV is written in several chunks
+    path = export_table(df, tmp_path / name, chunk_rows=4)
+
+    assert path == tmp_path / name
+    assert [p.name for p in tmp_path.iterdir()] == [name]
+    assert capsys.readouterr().out == ''
+    if name.endswith('.parquet'):
+        restored = load_table(path)
+    else:
+        restored = pd.read_csv(path, dtype={'source_doc_date': str})
+    pdt.assert_frame_equal(restored[df.columns], df, check_dtype=False)
+
+
+def test_ensure_mmap_tracks_source_content(tmp_path):
+    pytest.importorskip('pyarrow')
+    source = tmp_path / 'bank_metrics_validated.csv'
+    mmap_path = tmp_path / 'validated.mmap.arrow'
+    df = synthetic_panel(n_banks=3, n_periods=2, seed=3)
+    df.to_csv(source, index=False)
+    ensure_mmap(source, mmap_path)
+    built = os.stat(mmap_path).st_mtime_ns
+
+    # Same content, new timestamp: kept
+    os.utime(source, ns=(built + 10**9, built + 10**9))
+    ensure_mmap(source, mmap_path)
+    assert os.stat(mmap_path).st_mtime_ns == built
+
+    # Different content of the same size, copied with the old timestamps
+    stat = os.stat(source)
+    replacement = tmp_path / 'replacement.csv'
+    df.assign(gnpa_pct=df['gnpa_pct'][::-1].to_numpy()).to_csv(replacement, index=False)
+    assert os.stat(replacement).st_size == stat.st_size
+    os.utime(replacement, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    os.replace(replacement, source)
+    ensure_mmap(source, mmap_path)
+    assert open_mmap(mmap_path)['gnpa_pct'].tolist() == pytest.approx(df['gnpa_pct'][::-1].tolist())
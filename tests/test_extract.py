@@ -0,0 +1,150 @@
+"""PDF extraction against a small corpus of generated fixture filings"""
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+pytest.importorskip('pypdf')
+
+import src.extract as extract
+from src.extract import ExtractionCache, extract_directory, extract_pdf, update_checklist
+from src.ingest import merge_filled_data
+
+
+def _escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, pages, created='20260115000000'):
+    """Minimal uncompressed PDF: one Helvetica text block per page"""
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None,
+               '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+               f'<< /CreationDate (D:{created}) >>']
+    kids = []
+    for lines in pages:
+        body = 'BT /F1 11 Tf 72 720 Td 14 TL ' + ' '.join(f'({_escape(line)}) Tj T*' for line in lines) + ' ET'
+        objects.append(f'<< /Length {len(body)} >>\nstream\n{body}\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>')
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {len(kids)} >>'
+
+    out = b'%PDF-1.4\n'
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{obj}\nendobj\n'.encode('latin-1')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode()
+    out += (f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R /Info 4 0 R >>\n'
+            f'startxref\n{xref}\n%%EOF\n').encode()
+    path.write_bytes(out)
+    return path
+
+
+@pytest.fixture
+def filings(tmp_path):
+    corpus = tmp_path / 'filings'
+    corpus.mkdir()
+    write_pdf(corpus / 'SBI_quarterly_2025-Q3.pdf', [
+        ['Investor Presentation Q3 FY26', 'Gross Advances (Rs. Cr) 42,512.75'],
+        ['Asset Quality', 'Gross NPA (%) 2.45 2.56', 'Net NPA 0.38%',
+         'Gross NPA (Rs. Cr) 84,276.50'],
+        ['Net Interest Margin 3.12%', 'CASA Ratio 42.50%'],
+    ])
+    write_pdf(corpus / 'HDFCBANK_results_2025-Q2.pdf', [
+        ['GNPA: 1.32%  NNPA: 0.21%', 'NIM 4.15%'],   # CASA missing
+    ])
+    write_pdf(corpus / 'kotak-presentation.pdf', [
+        ['KOTAK Bank results for Q2 FY26', 'GNPA 1.15% NNPA 0.18% NIM 4.25% CASA 46.3%'],
+    ])
+    (corpus / 'broken.pdf').write_bytes(b'not a pdf')
+    return corpus
+
+
+def test_extract_pdf_metrics_and_provenance(filings):
+    row = extract_pdf(filings / 'SBI_quarterly_2025-Q3.pdf')
+    assert (row['bank_code'], row['quarter'], row['status']) == ('SBI', '2025-Q3', 'DONE')
+    assert [row[m] for m in ('gnpa_pct', 'nnpa_pct', 'nim_pct', 'casa_pct')] == [2.45, 0.38, 3.12, 42.5]
+    assert row['source_date'] == '2026-01-15'
+    assert "gnpa_pct p.2 'Gross NPA (%) 2.45'" in row['extracted_from']
+
+
+def test_extract_directory_partial_and_broken_files(filings):
+    extracted = extract_directory(filings, workers=2).set_index('source_file')
+    assert len(extracted) == 4
+
+    hdfc = extracted.loc['HDFCBANK_results_2025-Q2.pdf']
+    assert (hdfc['bank_code'], hdfc['status'], hdfc['casa_pct']) == ('HDFC', 'TODO', '')
+
+    # No bank/quarter in the file name: quarter from the text, bank unknown
+    kotak = extracted.loc['kotak-presentation.pdf']
+    assert (kotak['quarter'], kotak['status']) == ('2025-Q2', 'TODO')
+
+    assert extracted.loc['broken.pdf', 'extracted_from'].startswith('error:')
+
+
+def test_update_checklist_feeds_merge(filings, tmp_path):
+    checklist_path = tmp_path / 'collection_checklist.csv'
+    pd.DataFrame([
+        {'bank_code': 'SBI', 'bank_name': 'State Bank of India', 'nse_ticker': 'SBIN',
+         'quarter': '2025-Q3', 'status': 'TODO', 'gnpa_pct': None, 'nnpa_pct': None,
+         'nim_pct': None, 'casa_pct': None, 'source_url': None, 'source_date': None},
+        {'bank_code': 'HDFC', 'bank_name': 'HDFC Bank', 'nse_ticker': 'HDFCBANK',
+         'quarter': '2025-Q2', 'status': 'DONE', 'gnpa_pct': 1.3, 'nnpa_pct': 0.2,
+         'nim_pct': 4.1, 'casa_pct': 45.0, 'source_url': 'manual', 'source_date': '2025-10-20'},
+    ]).to_csv(checklist_path, index=False)
+
+    checklist = update_checklist(extract_directory(filings, workers=1), checklist_path)
+    assert len(checklist) == 2
+    hdfc = checklist[checklist['bank_code'] == 'HDFC'].iloc[0]
+    assert hdfc['source_url'] == 'manual'           # manual DONE row kept
+
+    final = merge_filled_data(pd.read_csv(checklist_path), tmp_path / 'bank_metrics.csv')
+    assert sorted(final['bank']) == ['HDFC', 'SBI']
+    assert final.set_index('bank').loc['SBI', 'gnpa_pct'] == 2.45
+
+
+@pytest.mark.parametrize('name', ['SBI_Q3FY26.pdf', 'SBIN-q3-FY2026.pdf', 'SBI_results_Q3_FY26.pdf'])
+def test_fiscal_quarter_file_names(name, tmp_path):
+    # The source_url naming (SBI_Q3FY26.pdf) also identifies bank and quarter
+    path = write_pdf(tmp_path / name, [['GNPA 2.45% NNPA 0.38% NIM 3.12% CASA 42.5%']])
+    row = extract_pdf(path)
+    assert (row['bank_code'], row['quarter'], row['status']) == ('SBI', '2025-Q3', 'DONE')
+
+
+def test_update_checklist_reports_skipped_files(filings, tmp_path, capsys):
+    update_checklist(extract_directory(filings, workers=1), tmp_path / 'collection_checklist.csv')
+    out = capsys.readouterr().out
+    assert 'Skipped kotak-presentation.pdf' in out
+    assert 'Skipped broken.pdf' in out
+    assert 'SBI_quarterly' not in out
+
+
+def test_cache_skips_unchanged_documents(filings, tmp_path, monkeypatch):
+    cache = ExtractionCache(tmp_path / 'cache')
+    first = extract_directory(filings, workers=2, cache=cache)
+    assert cache.stats == {'hits': 0, 'misses': 4, 'evicted': 0}
+
+    # Unchanged, renamed and changed documents
+    (filings / 'SBI_quarterly_2025-Q3.pdf').rename(filings / 'SBIN_results_2025-Q3.pdf')
+    write_pdf(filings / 'HDFCBANK_results_2025-Q2.pdf', [['GNPA 1.40% NNPA 0.25% NIM 4.1% CASA 44.0%']])
+    second = extract_directory(filings, workers=1, cache=cache)
+    assert (cache.stats['hits'], cache.stats['misses']) == (3, 1)
+    pdt.assert_frame_equal(second.drop(columns=['source_file', 'source_url']).iloc[[0, 2, 3]],
+                           first.drop(columns=['source_file', 'source_url']).iloc[[0, 2, 3]])
+    assert second.set_index('source_file').loc['SBIN_results_2025-Q3.pdf', 'bank_code'] == 'SBI'
+    assert second.set_index('source_file').loc['HDFCBANK_results_2025-Q2.pdf', 'status'] == 'DONE'
+
+    # A new extractor version misses everything and evicts old entries first
+    monkeypatch.setattr(extract, 'EXTRACTOR_VERSION', extract.EXTRACTOR_VERSION + 1)
+    extract_directory(filings, workers=1, cache=cache)
+    assert cache.stats == {'hits': 0, 'misses': 4, 'evicted': 5}
+
+
+def test_cache_eviction_bound(filings, tmp_path):
+    cache = ExtractionCache(tmp_path / 'cache', max_bytes=700)
+    extract_directory(filings, workers=1, cache=cache)
+    assert cache.stats['evicted'] > 0
+    assert cache.size() <= 700
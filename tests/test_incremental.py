@@ -0,0 +1,101 @@
+"""Incremental updates must match a full recompute over the same table"""
+
+import pandas as pd
+import pandas.testing as pdt
+
+from src.artifacts import build_artifacts, update_artifacts
+from src.panel import BankPanel
+from src.validate import DataValidator
+
+BANKS = ['SBI', 'HDFC', 'ICICI', 'AXIS', 'KOTAK']
+QUARTERS = ['2024-Q1', '2024-Q2', '2024-Q3', '2024-Q4', '2025-Q1']
+
+
+def make_row(bank, period, gnpa, nnpa=0.5, nim=3.5, casa=40.0):
+    return {
+        'bank': bank, 'period_type': 'Quarter', 'period': period,
+        'gnpa_pct': gnpa, 'nnpa_pct': nnpa, 'nim_pct': nim, 'casa_pct': casa,
+        'source_url': f'https://example.com/{bank}_{period}.pdf',
+        'source_doc_date': '2025-01-15', 'notes': '',
+    }
+
+
+def base_panel():
+    rows = [make_row(bank, period, gnpa=1.0 + b + q * 0.1, casa=35.0 + b * 2 + q)
+            for b, bank in enumerate(BANKS) for q, period in enumerate(QUARTERS)]
+    # Seed a few issues: GNPA < NNPA, NIM out of range, missing CASA
+    rows[3]['nnpa_pct'] = 5.0
+    rows[7]['nim_pct'] = 9.5
+    rows[12]['casa_pct'] = None
+    return pd.DataFrame(rows)
+
+
+def delta_rows():
+    return pd.DataFrame([
+        make_row('SBI', '2024-Q4', gnpa=1.2),                 # corrects an error row
+        make_row('HDFC', '2025-Q2', gnpa=1.5, casa=60.0),     # new latest quarter
+        make_row('ICICI', '2024-Q2', gnpa=0.2, nnpa=0.9),     # correction adding an error
+        make_row('NEWBANK', '2025-Q2', gnpa=4.0, nim=0.1),    # new bank
+    ])
+
+
+def test_validator_update_matches_full_run():
+    incremental = DataValidator(base_panel())
+    incremental.run_all_validations()
+    incremental.update(delta_rows())
+
+    # Full run over the table built independently: base then delta, last
+    # row per (bank, period) wins
+    merged = pd.concat([base_panel(), delta_rows()], ignore_index=True)
+    full = DataValidator(merged.drop_duplicates(['bank', 'period'], keep='last'))
+    full.run_all_validations()
+
+    pdt.assert_frame_equal(incremental.df, full.df)
+    pdt.assert_frame_equal(incremental.issues, full.issues)
+    pdt.assert_frame_equal(incremental.get_valid_data(), full.get_valid_data())
+
+
+def test_panel_upsert_matches_fresh_panel():
+    panel = BankPanel(base_panel())
+    panel.latest_index  # populate the cache so upsert patches it
+    panel.upsert(delta_rows())
+
+    fresh = BankPanel(panel.df)
+    pdt.assert_index_equal(panel.latest_index, fresh.latest_index)
+    assert panel.latest_period == fresh.latest_period
+
+
+def test_upsert_renumbers_non_integer_labels():
+    # Rows labelled by string (e.g. a table indexed by source file) have no
+    # next integer label, so the updated table is renumbered 0..n-1
+    base = base_panel()
+    base.index = [f"{bank}/{period}" for bank, period in zip(base['bank'], base['period'])]
+    merged = pd.concat([base_panel(), delta_rows()], ignore_index=True)
+    expected = merged.drop_duplicates(['bank', 'period'], keep='last').reset_index(drop=True)
+
+    incremental = DataValidator(base)
+    incremental.run_all_validations()
+    incremental.update(delta_rows())
+    full = DataValidator(expected)
+    full.run_all_validations()
+    pdt.assert_frame_equal(incremental.df, full.df)
+    pdt.assert_frame_equal(incremental.issues, full.issues)
+
+    panel = BankPanel(base)
+    panel.latest_index
+    panel.upsert(delta_rows())
+    pdt.assert_index_equal(panel.df.index, pd.RangeIndex(len(expected)))
+    pdt.assert_index_equal(panel.latest_index, BankPanel(panel.df).latest_index)
+
+
+def test_update_artifacts_matches_full_build():
+    panel = BankPanel(base_panel())
+    artifacts = build_artifacts(panel)
+    delta = delta_rows()
+    panel.upsert(delta)
+    updated = update_artifacts(artifacts, panel, delta)
+
+    expected = build_artifacts(BankPanel(panel.df))
+    assert set(updated) == set(expected)
+    for name in expected:
+        pdt.assert_frame_equal(updated[name], expected[name], obj=name)
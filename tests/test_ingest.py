@@ -0,0 +1,71 @@
+"""Streaming checklist merge must match an in-memory merge with the same dedup rule"""
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+from src.ingest import FINAL_COLUMNS, combine_checklists, merge_checklists, merge_filled_data
+
+
+def checklist(rows):
+    return pd.DataFrame([
+        {'bank_code': bank, 'bank_name': bank, 'nse_ticker': bank, 'quarter': quarter,
+         'status': status, 'gnpa_pct': gnpa, 'nnpa_pct': 0.5, 'nim_pct': 3.5, 'casa_pct': 40.0,
+         'source_url': f'https://example.com/{bank}_{quarter}.pdf', 'source_date': date}
+        for bank, quarter, status, gnpa, date in rows
+    ])
+
+
+@pytest.fixture
+def analyst_files(tmp_path):
+    first = checklist([
+        ('SBI', '2025-Q2', 'DONE', 2.50, '2025-10-20'),
+        ('SBI', '2025-Q3', 'DONE', 2.40, '2026-01-20'),   # newer than the correction below
+        ('HDFC', '2025-Q3', 'TODO', None, None),
+        ('HDFC', '2025-Q2', 'DONE', 1.30, '2025-10-18'),
+        ('AXIS', '2025-Q3', 'DONE', 1.90, None),
+    ])
+    second = checklist([
+        ('SBI', '2025-Q3', 'DONE', 2.45, '2026-01-15'),
+        ('HDFC', '2025-Q3', 'DONE', 1.32, '2026-01-14'),
+        ('HDFC', '2025-Q2', 'DONE', 1.31, '2025-10-25'),
+        ('AXIS', '2025-Q3', 'DONE', 1.89, '2026-01-12'),
+    ])
+    paths = [tmp_path / 'analyst_a.csv', tmp_path / 'analyst_b.csv']
+    first.to_csv(paths[0], index=False)
+    second.to_csv(paths[1], index=False)
+    return paths
+
+
+@pytest.mark.parametrize('dedup', ['last', 'source_date'])
+def test_streaming_merge_matches_in_memory(analyst_files, tmp_path, dedup):
+    stats = merge_checklists(analyst_files, tmp_path / 'merged.csv', dedup=dedup, chunksize=2)
+    merged = pd.read_csv(tmp_path / 'merged.csv')
+
+    combined = pd.concat([pd.read_csv(p) for p in analyst_files], ignore_index=True)
+    combined['position'] = range(len(combined))
+    if dedup == 'source_date':
+        combined['date'] = pd.to_datetime(combined['source_date'])
+        combined = combined.sort_values(['date', 'position'], na_position='first')
+    expected = combined.drop_duplicates(['bank_code', 'quarter'], keep='last').sort_values('position')
+    expected = merge_filled_data(expected[expected['status'] == 'DONE'], tmp_path / 'expected.csv')
+
+    assert list(merged.columns) == FINAL_COLUMNS
+    pdt.assert_frame_equal(merged, pd.read_csv(tmp_path / 'expected.csv'))
+    assert stats == {'rows_read': 9, 'done_rows': 8, 'duplicates_dropped': 3, 'rows_written': 5}
+
+
+def test_source_date_rule_keeps_newest(analyst_files, tmp_path):
+    merge_checklists(analyst_files, tmp_path / 'merged.csv', dedup='source_date', chunksize=3)
+    gnpa = pd.read_csv(tmp_path / 'merged.csv').set_index(['bank', 'period'])['gnpa_pct']
+    assert gnpa[('SBI', '2025-Q3')] == 2.40    # older file, newer filing
+    assert gnpa[('HDFC', '2025-Q2')] == 1.31
+    assert gnpa[('AXIS', '2025-Q3')] == 1.89   # dated row beats undated
+
+
+@pytest.mark.parametrize('dedup', ['last', 'source_date'])
+def test_in_memory_combine_matches_streaming_merge(analyst_files, tmp_path, dedup):
+    merge_checklists(analyst_files, tmp_path / 'merged.csv', dedup=dedup, chunksize=2)
+    frames = [pd.read_csv(p, dtype={'source_url': str, 'source_date': str}) for p in analyst_files]
+    combine_checklists(frames, dedup=dedup).to_csv(tmp_path / 'combined.csv', index=False)
+    pdt.assert_frame_equal(pd.read_csv(tmp_path / 'combined.csv'), pd.read_csv(tmp_path / 'merged.csv'))
@@ -0,0 +1,74 @@
+"""Shared panel: artifact keys and the dense tensor view"""
+
+import pandas as pd
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from benchmarks.synthetic import synthetic_panel
+from src.artifacts import system_trend
+from src.data_model import PANEL_COLUMNS, PERIOD_COLUMNS, WEIGHT_COLUMN, \
+    ensure_mmap, load_table, open_mmap, save_table, table_columns
+from src.panel import BankPanel, PanelTensor
+
+
+@pytest.fixture
+def validated(tmp_path):
+    path = tmp_path / 'bank_metrics_validated.parquet'
+    df = synthetic_panel(n_banks=6, n_periods=5, seed=1)
+    df[WEIGHT_COLUMN] = range(100, 100 + len(df))
+    save_table(df, path, verbose=False)
+    return path
+
+
+def test_dashboard_and_build_panels_share_artifact_key(validated, tmp_path):
+    # analytics.py / pipeline --artifacts: the full table
+    build = BankPanel(load_table(validated))
+    # app.py: the shared mmap projection, and the per-session fallback
+    mmap_path = ensure_mmap(validated, tmp_path / 'validated.mmap.arrow')
+    shared = BankPanel(open_mmap(mmap_path, columns=PANEL_COLUMNS + list(PERIOD_COLUMNS)), copy=False)
+    available = table_columns(validated)
+    session = BankPanel(load_table(validated, columns=[c for c in PANEL_COLUMNS if c in available],
+                                   compact=True))
+
+    assert shared.data_hash == build.data_hash == session.data_hash
+    # Free text does not key artifacts; metrics do
+    assert BankPanel(build.df.assign(notes='edited')).data_hash == build.data_hash
+    assert BankPanel(build.df.assign(gnpa_pct=build.df['gnpa_pct'] + 0.01)).data_hash != build.data_hash
+    assert BankPanel(build.df.assign(**{WEIGHT_COLUMN: 1.0})).data_hash != build.data_hash
+    # Both dashboard paths keep the weights the weighted aggregates need
+    for panel in (shared, session):
+        assert 'gnpa_pct_weighted' in system_trend(panel.df).columns
+
+
+def test_tensor_latest_index_matches_panel(validated):
+    df = load_table(validated)
+    # FY rows after their Q4, unparseable labels (all period_key -1) and a
+    # bank outside the universe
+    extra = df[df['bank'] == df['bank'].iloc[0]].head(3).assign(period=['FY2099', 'H1 junk', 'H2 junk'])
+    orphan = extra.assign(bank='ZZORPHAN', period=['H2 junk', 'H1 junk', 'Q1 junk'])
+    df = pd.concat([df, extra, orphan], ignore_index=True)
+
+    for data in (df, df.assign(bank=df['bank'].astype('category'))):
+        panel, tensor = BankPanel(data), PanelTensor(data)
+        assert tensor.latest_index.equals(panel.latest_index)
+        pd.testing.assert_frame_equal(tensor.latest(), panel.latest())
+        latest = tensor.latest_values()
+        assert latest.loc['ZZORPHAN', 'gnpa_pct'] == pytest.approx(orphan['gnpa_pct'].iloc[0])
+
+        tensor.upsert(data.tail(1).assign(period='FY2100'))
+        panel.upsert(data.tail(1).assign(period='FY2100'))
+        assert tensor.latest_index.equals(panel.latest_index)
+
+
+def test_tensor_skips_rows_without_bank(validated):
+    df = load_table(validated)
+    df = pd.concat([df, df.head(2).assign(bank=None)], ignore_index=True)
+
+    panel, tensor = BankPanel(df), PanelTensor(df)
+    assert tensor.present.sum() == len(df) - 2
+    assert tensor.latest_index.equals(panel.latest_index)
+    expected = panel.latest().set_index('bank')[PanelTensor.METRICS]
+    latest = tensor.latest_values()
+    pd.testing.assert_frame_equal(latest, expected.loc[latest.index], check_dtype=False,
+                                  check_index_type=False, check_names=False)
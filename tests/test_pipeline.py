@@ -0,0 +1,77 @@
+"""Pipeline runner: same outputs as the step scripts, unchanged stages skipped"""
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.analytics import AssetQualityAnalytics, PeerComparisonAnalytics
+from src.ingest import SAMPLE_FILLED_DATA, merge_filled_data
+from src.pipeline import FINAL_FILES, INTERMEDIATE_FILES, StageCache, run_pipeline
+from src.validate import DataValidator
+
+
+@pytest.fixture
+def checklist(tmp_path):
+    path = tmp_path / 'collection_checklist.csv'
+    pd.DataFrame(SAMPLE_FILLED_DATA).to_csv(path, index=False)
+    return path
+
+
+def test_matches_step_scripts(checklist, tmp_path):
+    final, report = run_pipeline([checklist], out_dir=tmp_path / 'out', cache=None)
+
+    tidy = merge_filled_data(pd.read_csv(checklist), tmp_path / 'bank_metrics.csv')
+    validator = DataValidator(tidy)
+    validator.run_all_validations()
+    valid = validator.get_valid_data()
+    pdt.assert_frame_equal(final['rankings'],
+                           PeerComparisonAnalytics(valid).latest_rankings().reset_index(drop=True))
+    pdt.assert_frame_equal(final['spread'],
+                           AssetQualityAnalytics(valid).spread_analysis().reset_index(drop=True))
+
+    assert list(report['stage']) == ['bank_list', 'ingest', 'validate', 'analytics', 'write']
+    assert sorted(p.name for p in (tmp_path / 'out').iterdir()) == sorted(
+        path for paths in FINAL_FILES.values() for path in paths)
+
+
+def test_cache_skips_unchanged_stages(checklist, tmp_path):
+    cache = StageCache(tmp_path / 'cache')
+    first, report = run_pipeline([checklist], out_dir=tmp_path / 'out', cache=cache)
+    assert set(report['status']) == {'run'}
+
+    second, report = run_pipeline([checklist], out_dir=tmp_path / 'out', cache=cache,
+                                  keep_intermediate=True)
+    assert list(report['status'][:4]) == ['cached'] * 4
+    for name in first:
+        pdt.assert_frame_equal(second[name], first[name], check_dtype=False)
+    for paths in INTERMEDIATE_FILES.values():
+        assert all((tmp_path / 'out' / path).exists() for path in paths)
+
+    # A corrected value re-runs ingest and everything downstream of it
+    edited = pd.read_csv(checklist)
+    edited.loc[edited['bank_code'] == 'SBI', 'gnpa_pct'] = 2.50
+    edited.to_csv(checklist, index=False)
+    third, report = run_pipeline([checklist], out_dir=tmp_path / 'out', cache=cache)
+    assert list(report['status'][:4]) == ['cached', 'run', 'run', 'run']
+    assert third['rankings'].set_index('bank').loc['SBI', 'gnpa_pct'] == 2.50
+
+
+def test_banks_outside_universe_kept_and_reported(tmp_path):
+    # CBI is an optional bank, outside the default universe
+    path = tmp_path / 'collection_checklist.csv'
+    extra = dict(SAMPLE_FILLED_DATA[0], bank_code='CBI', bank_name='Central Bank of India')
+    pd.DataFrame(SAMPLE_FILLED_DATA + [extra]).to_csv(path, index=False)
+
+    kept, report = run_pipeline([path], out_dir=tmp_path / 'out')
+    assert 'CBI' in set(kept['rankings']['bank'])
+    assert report.set_index('stage').loc['ingest', 'rows']['unlisted'] == 1
+
+    dropped, report = run_pipeline([path], out_dir=tmp_path / 'out', universe_only=True,
+                                   keep_intermediate=True)
+    assert 'CBI' not in set(dropped['rankings']['bank'])
+    assert pd.read_csv(tmp_path / 'out' / 'unlisted_rows.csv').values.tolist() == [['CBI', '2025-Q3']]
+
+    _, report = run_pipeline([path], out_dir=tmp_path / 'out', include_optional=True, universe_only=True)
+    assert report.set_index('stage').loc['ingest', 'rows']['unlisted'] == 0
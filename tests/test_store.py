@@ -0,0 +1,80 @@
+"""Keyed store: upserts and deletes rewrite only the partitions they touch"""
+
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+pytest.importorskip('pyarrow')
+
+from src.data_model import create_sample_data
+from src.store import TidyStore
+from src.validate import DataValidator
+
+
+@pytest.fixture
+def table():
+    rows = []
+    for period, shift in (('2025-Q1', 0.2), ('2025-Q2', 0.1), ('2025-Q3', 0.0)):
+        rows.append(create_sample_data().assign(period=period, gnpa_pct=lambda d: d['gnpa_pct'] + shift))
+    return pd.concat(rows, ignore_index=True)
+
+
+def inodes(store):
+    """Inode of every partition and index file (a rewrite replaces it)"""
+    files = list(store.root.glob('*.parquet')) + list((store.root / '_index').glob('*.parquet'))
+    return {str(path.relative_to(store.root)): path.stat().st_ino for path in files}
+
+
+@pytest.mark.parametrize('partition_by', ['bank', 'fiscal_year'])
+def test_upsert_rewrites_one_partition(table, tmp_path, partition_by):
+    store = TidyStore(tmp_path / 'store', partition_by=partition_by)
+    assert store.upsert(table)['inserted'] == len(table)
+    before = inodes(store)
+
+    fix = table[(table['bank'] == 'SBI') & (table['period'] == '2025-Q3')].assign(gnpa_pct=9.9)
+    assert store.upsert(fix) == {'inserted': 0, 'updated': 1, 'partitions_written': 1}
+    after = inodes(store)
+    # One partition and its key index, nothing else
+    assert sum(before[name] != after[name] for name in before) == 2
+
+    assert store.get('SBI', '2025-Q3')['gnpa_pct'].tolist() == [9.9]
+    assert store.history('SBI')['period'].tolist() == ['2025-Q1', '2025-Q2', '2025-Q3']
+    assert len(TidyStore(tmp_path / 'store')) == len(table)
+
+
+def test_unknown_bank_reads_empty(table, tmp_path):
+    store = TidyStore(tmp_path / 'store')
+    assert store.history('UNKNOWN').empty
+    store.upsert(table)
+    history = store.history('UNKNOWN')
+    assert history.empty and 'period_key' in history.columns
+    assert store.get('UNKNOWN', '2025-Q3').empty
+    assert store.history('UNKNOWN', columns=['period', 'gnpa_pct']).empty
+
+
+def test_delete_and_reopen(table, tmp_path):
+    store = TidyStore(tmp_path / 'store')
+    store.upsert(table)
+    assert store.delete([('SBI', '2025-Q1'), ('SBI', '2025-Q2'), ('SBI', '2025-Q3'), ('XYZ', '2025-Q3')]) == 3
+    assert not (tmp_path / 'store' / 'bank=SBI.parquet').exists()
+    assert store.get('SBI', '2025-Q3').empty
+
+    reopened = TidyStore(tmp_path / 'store')
+    expected = table[table['bank'] != 'SBI'].sort_values(['bank', 'period']).reset_index(drop=True)
+    pdt.assert_frame_equal(reopened.read(columns=['bank', 'period', 'gnpa_pct']),
+                           expected[['bank', 'period', 'gnpa_pct']], check_dtype=False)
+    pdt.assert_frame_equal(reopened.rebuild_index(), reopened.index)
+
+    with pytest.raises(ValueError):
+        TidyStore(tmp_path / 'store', partition_by='fiscal_year')
+
+
+def test_validator_writes_through(table, tmp_path):
+    store = TidyStore(tmp_path / 'store')
+    store.upsert(table)
+    bad = table[table['bank'] == 'HDFC'].assign(nnpa_pct=50.0)   # NNPA > GNPA is an error
+    validator = DataValidator(pd.concat([table[table['bank'] != 'HDFC'], bad], ignore_index=True))
+    validator.run_all_validations()
+
+    assert validator.save_to_store(store) == {'upserted': len(table) - 3, 'deleted': 3}
+    assert 'HDFC' not in set(store.index['bank'])
@@ -0,0 +1,63 @@
+"""Validation rules: one violation per rule, reported with label and severity"""
+
+import numpy as np
+import pandas as pd
+
+from src.validate import RULES, DataValidator
+
+# bank, gnpa, nnpa, nim, casa -> rules violated
+CASES = [
+    ('CLEAN', 2.0, 0.5, 3.0, 40.0, []),
+    ('R1', 1.0, 1.5, 3.0, 40.0, ['rule_1']),
+    ('R2HI', 2.0, 0.5, 9.5, 40.0, ['rule_2']),
+    ('R2LO', 2.0, 0.5, 0.2, 40.0, ['rule_2']),
+    ('R3', 2.0, 0.5, 3.0, 120.0, ['rule_3']),
+    ('R4', 16.0, 0.5, 3.0, 40.0, ['rule_4']),
+    ('R5', 2.0, 0.5, np.nan, 40.0, ['rule_5']),
+    ('R6', 5.0, 3.5, 3.0, 40.0, ['rule_6']),
+    ('R1R6', 3.0, 3.5, 3.0, 40.0, ['rule_1', 'rule_6']),
+    ('EDGE', 15.0, 3.0, 8.0, 100.0, []),   # every value on its range bound
+]
+
+
+def cases_frame():
+    return pd.DataFrame([
+        {'bank': bank, 'period_type': 'Quarter', 'period': '2025-Q3', 'gnpa_pct': gnpa,
+         'nnpa_pct': nnpa, 'nim_pct': nim, 'casa_pct': casa}
+        for bank, gnpa, nnpa, nim, casa, _ in CASES
+    ])
+
+
+def test_each_rule_reports_label_severity_and_count():
+    validator = DataValidator(cases_frame())
+    counts = validator.run_all_validations()
+
+    expected = {key: sorted(bank for bank, *_, rules in CASES if key in rules) for key in RULES}
+    assert counts == {key: len(banks) for key, banks in expected.items()}
+
+    issues = validator.issues
+    for key, rule in RULES.items():
+        found = issues[issues['rule'] == rule['label']]
+        assert sorted(found['bank']) == expected[key], key
+        assert (found['severity'] == rule['severity']).all()
+
+    assert len(validator.errors) == len(expected['rule_1']) + len(expected['rule_3']) + len(expected['rule_5'])
+    assert len(validator.warnings) == len(expected['rule_2']) + len(expected['rule_4']) + len(expected['rule_6'])
+    assert sorted(validator.get_valid_data()['bank']) == ['CLEAN', 'EDGE', 'R2HI', 'R2LO', 'R4', 'R6']
+
+    nnpa = [issue for issue in validator.warnings if issue['bank'] == 'R6']
+    assert nnpa == [{'bank': 'R6', 'period': '2025-Q3', 'rule': '6: NNPA out of range',
+                     'severity': 'WARNING', 'detail': 'NNPA=3.50% (expected 0-3%)'}]
+
+
+def test_rule_methods_match_rule_table():
+    methods = {
+        'rule_1': 'validate_rule_1_gnpa_nnpa', 'rule_2': 'validate_rule_2_nim_range',
+        'rule_3': 'validate_rule_3_casa_range', 'rule_4': 'validate_rule_4_gnpa_range',
+        'rule_5': 'validate_rule_5_missing_values', 'rule_6': 'validate_rule_6_nnpa_range',
+    }
+    assert set(methods) == set(RULES)
+    full = DataValidator(cases_frame())
+    counts = full.run_all_validations()
+    for key, name in methods.items():
+        assert getattr(DataValidator(cases_frame()), name)() == counts[key], name